@@ -0,0 +1,257 @@
+# benchmarks/mock_site.py - 오프라인 벤치마크용 aipartner 모의 서버
+#
+# 실제 사이트의 셀렉터 구조(로그인 폼, ad_list 테이블/페이지네이션, 노출종료 확인 팝업,
+# 선택 노출종료, 종료매물 목록의 재광고 버튼, ad_regist 광고하기/결제)를 흉내 내는 상태 저장 HTTP 서버.
+# 단독 실행: python benchmarks/mock_site.py --pages 5 --page-size 10 --popups
+
+import argparse
+import html
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class MockSiteState:
+    """매물 목록 상태 (광고중 / 종료) 및 처리 이력"""
+
+    def __init__(self, total_listings, page_size, first_number=2400000001):
+        self.page_size = page_size
+        self.active = [str(first_number + i) for i in range(total_listings)]
+        self.ended = []
+        self.paid = []
+        self.lock = threading.Lock()
+
+    def page_count(self, listings):
+        return max(1, -(-len(listings) // self.page_size))
+
+    def end_exposure(self, number):
+        with self.lock:
+            if number in self.active:
+                self.active.remove(number)
+                self.ended.insert(0, number)
+
+    def pay(self, number):
+        # 재광고 결제 시 종료 목록에서 빠지고 광고중 목록 맨 앞에 다시 등록됨
+        with self.lock:
+            if number in self.ended:
+                self.ended.remove(number)
+            if number not in self.active:
+                self.active.insert(0, number)
+            self.paid.append(number)
+
+class MockSiteConfig:
+    def __init__(self, latency_ms=0, popups=False, dialogs=True, load_alerts=False, bulk_end=True):
+        self.latency_ms = latency_ms
+        self.popups = popups
+        self.dialogs = dialogs
+        self.load_alerts = load_alerts
+        self.bulk_end = bulk_end
+
+LOGIN_PAGE = '''<!doctype html>
+<html><head><meta charset="utf-8"><title>로그인</title></head>
+<body>
+<div id="integrated-login">
+  <input id="member-id"><input id="member-pw" type="password">
+  <a href="#" onclick="document.cookie='mock_session=1; path=/'; location.href='/offerings/ad_list'; return false;">로그인</a>
+</div>
+</body></html>'''
+
+POPUP_LAYER = '''
+<div class="popup-layer" style="position:fixed;top:0;left:0;width:100%;height:100%;z-index:5000;background:rgba(0,0,0,.5)">
+  <img src="/static/popup_banner.png"><button class="close">닫기</button>
+</div>
+<script>
+  // 로드 후 뒤늦게 삽입되는 팝업 (MutationObserver 경로 검증용)
+  setTimeout(() => {
+    const layer = document.createElement('div');
+    layer.id = 'eventPopup';
+    layer.style.cssText = 'position:fixed;top:10%;left:10%;width:80%;height:80%;z-index:6000;background:#fff';
+    document.body.appendChild(layer);
+  }, 300);
+</script>'''
+
+def render_ad_list(state, config, page_no, status, keyword=''):
+    with state.lock:
+        listings = list(state.ended if status == 'end' else state.active)
+    if keyword:
+        listings = [number for number in listings if keyword in number]
+    page_count = state.page_count(listings)
+    page_no = min(max(page_no, 1), page_count)
+    start = (page_no - 1) * state.page_size
+    rows = []
+    for offset, number in enumerate(listings[start:start + state.page_size]):
+        if status == 'end':
+            action = f'<button id="reReg" onclick="location.href=\'/offerings/ad_regist?number={number}\'">재광고</button>'
+        elif config.dialogs:
+            action = f'<button id="naverEnd" onclick="if (confirm(\'노출종료 하시겠습니까?\')) endAd(\'{number}\')">노출종료</button>'
+        else:
+            action = f'<button id="naverEnd" onclick="endAd(\'{number}\')">노출종료</button>'
+        rows.append(
+            f'<tr><td><input type="checkbox" name="chk" value="{number}"></td>'
+            f'<td>테스트 매물 {start + offset + 1}</td>'
+            f'<td><div class="numberN">{number}</div></td>'
+            f'<td>매매</td><td>{(start + offset + 1) * 1000}만원</td>'
+            f'<td>{action}</td></tr>'
+        )
+
+    status_query = '&status=end' if status == 'end' else ''
+    if keyword:
+        status_query += f'&searchKeyword={html.escape(keyword)}'
+    page_links = ''.join(f'<a href="?page={n}{status_query}">{n}</a>' for n in range(1, page_count + 1))
+    next_class = 'next disabled' if page_no >= page_count else 'next'
+    bulk_button = bulk_cancelled = ''
+    if config.bulk_end and status != 'end':
+        bulk_button = '<button id="naverEndAll" onclick="endSelected()">선택 노출종료</button>'
+    bulk_cancelled = '!confirm("선택한 매물을 노출종료 하시겠습니까?")' if config.dialogs else 'false'
+    pagination = (
+        f'<span><a href="?page=1{status_query}">처음</a></span>'
+        f'<span><a href="?page={max(1, page_no - 1)}{status_query}">이전</a></span>'
+        f'<span>{page_links}</span>'
+        f'<span>…</span>'
+        f'<span><a class="{next_class}" href="?page={min(page_count, page_no + 1)}{status_query}">다음</a></span>'
+    )
+
+    return f'''<!doctype html>
+<html><head><meta charset="utf-8"><title>매물관리</title></head>
+<body>
+<div id="wrap"><div><div><div><div class="sectionWrap">
+  <div class="singleSection listSection">
+    <a class="statusAdEnd" href="/offerings/ad_list?status=end">광고종료</a>
+    <form method="get" action="/offerings/ad_list"><input name="searchKeyword" value="{html.escape(keyword)}"></form>
+    {bulk_button}
+    <table><tbody>{''.join(rows) or '<tr><td>매물 없음</td></tr>'}</tbody></table>
+    <div class="pagination">{pagination}</div>
+  </div>
+</div></div></div></div></div>
+<script>
+  function endAd(number) {{
+    fetch('/api/end?number=' + number, {{method: 'POST'}}).then(() => location.reload());
+  }}
+  function endSelected() {{
+    const numbers = [...document.querySelectorAll('input[name="chk"]:checked')].map(el => el.value);
+    if (!numbers.length || {bulk_cancelled}) return;
+    Promise.all(numbers.map(n => fetch('/api/end?number=' + n, {{method: 'POST'}}))).then(() => location.reload());
+  }}
+</script>
+{POPUP_LAYER if config.popups else ''}
+{"<script>alert('공지사항: 모의 서버입니다.');</script>" if config.load_alerts else ''}
+</body></html>'''
+
+def render_ad_regist(number):
+    number = html.escape(number)
+    return f'''<!doctype html>
+<html><head><meta charset="utf-8"><title>광고등록</title></head>
+<body>
+<div id="regist"><p>매물번호 {number} 재광고 등록</p>
+  <button onclick="document.getElementById('payment').style.display='block'">광고하기</button>
+</div>
+<div id="payment" style="display:none">
+  <label><input type="checkbox" id="consentMobile2"> 결제 동의</label>
+  <button id="naverSendSave" onclick="pay()">결제하기</button>
+</div>
+<script>
+  function pay() {{
+    if (!document.getElementById('consentMobile2').checked) {{ alert('동의가 필요합니다.'); return; }}
+    fetch('/api/pay?number={number}', {{method: 'POST'}}).then(() => alert('결제가 완료되었습니다.'));
+  }}
+</script>
+</body></html>'''
+
+def make_handler(state, config):
+    class MockSiteHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=b'', content_type='text/html; charset=utf-8', headers=None):
+            if config.latency_ms:
+                time.sleep(config.latency_ms / 1000)
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _logged_in(self):
+            return 'mock_session=1' in self.headers.get('Cookie', '')
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+            if url.path == '/integrated/login':
+                self._send(200, LOGIN_PAGE.encode())
+            elif url.path == '/offerings/ad_list':
+                if not self._logged_in():
+                    self._send(302, headers={'Location': '/integrated/login?serviceCode=1000'})
+                    return
+                page_no = int(query.get('page', ['1'])[0])
+                status = query.get('status', [''])[0]
+                keyword = query.get('searchKeyword', [''])[0]
+                self._send(200, render_ad_list(state, config, page_no, status, keyword).encode())
+            elif url.path == '/offerings/ad_regist':
+                self._send(200, render_ad_regist(query.get('number', [''])[0]).encode())
+            elif url.path.startswith('/static/'):
+                self._send(200, b'', content_type='image/png')
+            else:
+                self._send(404, b'not found')
+
+        def do_POST(self):
+            url = urlparse(self.path)
+            number = parse_qs(url.query).get('number', [''])[0]
+            if url.path == '/api/end':
+                state.end_exposure(number)
+            elif url.path == '/api/pay':
+                state.pay(number)
+            else:
+                self._send(404, b'not found')
+                return
+            self._send(200, json.dumps({'result': 'ok'}).encode(), content_type='application/json')
+
+    return MockSiteHandler
+
+class MockSite:
+    """백그라운드 스레드에서 동작하는 모의 서버"""
+
+    def __init__(self, state, config, host='127.0.0.1', port=0):
+        self.state = state
+        self.server = ThreadingHTTPServer((host, port), make_handler(state, config))
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+def main():
+    parser = argparse.ArgumentParser(description='aipartner 모의 서버')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=10)
+    parser.add_argument('--latency-ms', type=int, default=0)
+    parser.add_argument('--popups', action='store_true')
+    parser.add_argument('--no-dialogs', action='store_true')
+    parser.add_argument('--load-alerts', action='store_true')
+    parser.add_argument('--no-bulk-end', action='store_true')
+    args = parser.parse_args()
+
+    state = MockSiteState(args.pages * args.page_size, args.page_size)
+    config = MockSiteConfig(args.latency_ms, args.popups, not args.no_dialogs, args.load_alerts, not args.no_bulk_end)
+    site = MockSite(state, config, port=args.port).start()
+    print(f"🧪 모의 서버 실행 중: {site.base_url}/integrated/login")
+    try:
+        site.thread.join()
+    except KeyboardInterrupt:
+        site.stop()
+
+if __name__ == "__main__":
+    main()
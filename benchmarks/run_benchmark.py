@@ -0,0 +1,120 @@
+# benchmarks/run_benchmark.py - 모의 서버 대상 처리량/단계별 지연 벤치마크
+#
+# 실제 사이트 없이 MultiPropertyAutomation 전체 흐름(로그인 → 인덱스 → 검색 → 노출종료 →
+# 재광고 → 결제)을 로컬 모의 서버에 대해 실행하고, 분당 처리 매물 수와 단계별 지연을 출력한다.
+# 예: python benchmarks/run_benchmark.py --pages 8 --targets 20 --workers 3 --popups
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_site import MockSite, MockSiteConfig, MockSiteState
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='다중 매물 자동화 오프라인 벤치마크')
+    parser.add_argument('--pages', type=int, default=5, help='광고중 목록 페이지 수')
+    parser.add_argument('--page-size', type=int, default=10, help='페이지당 매물 수')
+    parser.add_argument('--targets', type=int, default=10, help='처리할 매물 수')
+    parser.add_argument('--workers', type=int, default=1, help='병렬 워커 수')
+    parser.add_argument('--interval', type=float, default=0, help='매물 처리 시작 간격(초)')
+    parser.add_argument('--latency-ms', type=int, default=0, help='요청당 서버 지연(ms)')
+    parser.add_argument('--popups', action='store_true', help='팝업 오버레이 삽입')
+    parser.add_argument('--no-dialogs', action='store_true', help='노출종료 확인 팝업 제거')
+    parser.add_argument('--load-alerts', action='store_true', help='목록 로드 시 alert 발생')
+    parser.add_argument('--no-bulk-end', action='store_true', help='선택 노출종료 버튼 제거 (매물별 노출종료)')
+    parser.add_argument('--block-resources', action='store_true', help='리소스 차단 모드 사용')
+    parser.add_argument('--search-mode', default='auto', choices=['auto', 'off'], help='서버 검색 사용 여부')
+    parser.add_argument('--throttle', default='fixed', choices=['fixed', 'adaptive'], help='처리 속도 조절 방식 (고정 간격 / 응답 기반 자동)')
+    parser.add_argument('--list-fetch', default='auto', choices=['auto', 'browser'], help='목록 조회 방식 (HTTP 우선 / 브라우저만)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', help='결과 JSON 저장 경로')
+    return parser.parse_args()
+
+async def run_benchmark(args):
+    state = MockSiteState(args.pages * args.page_size, args.page_size)
+    config = MockSiteConfig(args.latency_ms, args.popups, not args.no_dialogs, args.load_alerts, not args.no_bulk_end)
+    site = MockSite(state, config).start()
+
+    targets = random.Random(args.seed).sample(state.active, min(args.targets, len(state.active)))
+    work_dir = tempfile.mkdtemp(prefix='property_bench_')
+
+    # 자동화 설정은 환경변수로 전달 (결과물은 임시 디렉터리에 기록)
+    os.environ.update({
+        'PROPERTY_NUMBERS': ','.join(targets),
+        'TEST_MODE': 'false',
+        'WORKER_COUNT': str(args.workers),
+        'PROPERTY_INTERVAL': str(args.interval),
+        'SLOW_MO': '0',
+        'BLOCK_RESOURCES': 'true' if args.block_resources else 'false',
+        'SEARCH_MODE': args.search_mode,
+        'LIST_FETCH_MODE': args.list_fetch,
+        'THROTTLE': args.throttle,
+        'THROTTLE_MIN_INTERVAL': str(args.interval),
+        'SESSION_CACHE_PATH': '',
+        'RUN_ID': f"bench_{int(time.time())}",
+        'RUN_JOURNAL_PATH': os.path.join(work_dir, 'run_journal.jsonl'),
+        'RUN_REPORT_PATH': os.path.join(work_dir, 'run_report.json')
+    })
+
+    from multi_property_automation import MultiPropertyAutomation
+
+    automation = MultiPropertyAutomation()
+    automation.login_url = f"{site.base_url}/integrated/login?serviceCode=1000"
+    automation.ad_list_url = f"{site.base_url}/offerings/ad_list"
+    automation.max_pages = args.pages
+
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    started = time.perf_counter()
+    try:
+        await automation.run_automation()
+    finally:
+        elapsed = time.perf_counter() - started
+        os.chdir(cwd)
+        site.stop()
+
+    paid = set(state.paid)
+    completed = [number for number in targets if number in paid]
+    result = {
+        'config': vars(args),
+        'elapsed_s': round(elapsed, 2),
+        'targets': len(targets),
+        'completed': len(completed),
+        'double_paid': len(state.paid) - len(paid),
+        'properties_per_minute': round(len(completed) / elapsed * 60, 2) if elapsed else 0,
+        'phases': automation.metrics.summary(),
+        'counters': automation.metrics.counters,
+        'work_dir': work_dir
+    }
+    return result
+
+def print_result(result):
+    print("\n" + "="*80)
+    print("📈 벤치마크 결과")
+    print(f"   완료: {result['completed']}/{result['targets']}개 (중복 결제 {result['double_paid']}건)")
+    print(f"   소요: {result['elapsed_s']}초, 처리량: {result['properties_per_minute']}개/분")
+    print("   단계별 지연 (평균 / p95 / 최대, ms):")
+    for name, stats in sorted(result['phases'].items(), key=lambda item: -item[1]['total_ms']):
+        print(f"   - {name:<12} {stats['count']:>4}회  {stats['avg_ms']:>6} / {stats['p95_ms']:>6} / {stats['max_ms']:>6}")
+    if result['counters']:
+        print(f"   이벤트: {json.dumps(result['counters'], ensure_ascii=False)}")
+    print("="*80)
+
+def main():
+    args = parse_args()
+    result = asyncio.run(run_benchmark(args))
+    print_result(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"📝 결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    main()
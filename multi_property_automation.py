@@ -1,640 +1,3264 @@
 # multi_property_automation.py - 다중 매물 처리
 
+import argparse
 import asyncio
+import atexit
+import contextlib
+import csv
+import contextvars
+import fnmatch
+import gzip
+import http.client
+import json
+import logging
+import logging.handlers
 import os
+import queue
+import random
+import re
 import sys
-from datetime import datetime
-from playwright.async_api import async_playwright
+import threading
+import time
+from datetime import datetime, timedelta
+from html.parser import HTMLParser
+from http.cookies import SimpleCookie
+from urllib.parse import urljoin, urlsplit
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+def env_list(name, default=''):
+    """콤마로 구분된 환경변수를 리스트로 변환"""
+    return [item.strip() for item in os.getenv(name, default).split(',') if item.strip()]
+
+def iter_property_numbers(source, input_format=''):
+    """파일('-'이면 표준입력)에서 매물번호를 한 건씩 읽는 제너레이터
+
+    형식: csv(첫 번째 열, 숫자가 아닌 머리행은 건너뜀), jsonl(문자열/숫자 또는
+    property/number 키를 가진 객체), text(줄마다 매물번호, 콤마 구분 허용).
+    형식을 지정하지 않으면 확장자로 판단하고, 그 외에는 text로 읽는다.
+    """
+    input_format = input_format or {'.csv': 'csv', '.jsonl': 'jsonl'}.get(os.path.splitext(source)[1].lower(), 'text')
+    f = sys.stdin if source == '-' else open(source, encoding='utf-8-sig', newline='')
+    try:
+        if input_format == 'csv':
+            for i, row in enumerate(csv.reader(f)):
+                value = row[0].strip() if row else ''
+                if value and not (i == 0 and not value.isdigit()):
+                    yield value
+        elif input_format == 'jsonl':
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if isinstance(entry, dict):
+                    entry = entry.get('property') or entry.get('number') or ''
+                value = str(entry).strip()
+                if value:
+                    yield value
+        else:
+            for line in f:
+                for value in line.split(','):
+                    if value.strip():
+                        yield value.strip()
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+# 처리 계획에서 이전 실행 완료로 제외된 매물 사유 (성공으로 집계)
+SKIP_COMPLETED = '이전 실행에서 결제까지 완료'
+
+# 현재 작업 중인 매물번호와 실패 유형 (워커 태스크별로 분리되는 컨텍스트 변수)
+current_property = contextvars.ContextVar('current_property', default=None)
+current_failure = contextvars.ContextVar('current_failure', default=None)
+
+# 로그 컨텍스트: 워커 번호, 처리 단계, 광고중 목록 페이지, 매물 처리 시작 시각(perf_counter)
+current_worker = contextvars.ContextVar('current_worker', default=None)
+current_phase = contextvars.ContextVar('current_phase', default=None)
+current_list_page = contextvars.ContextVar('current_list_page', default=None)
+current_started = contextvars.ContextVar('current_started', default=None)
+
+log = logging.getLogger('property_automation')
+progress_log = logging.getLogger('property_automation.progress')
+_log_listener = None
+
+class LogContext(logging.Filter):
+    """로그를 남긴 태스크의 컨텍스트(워커/매물/단계/페이지/경과 시간)를 레코드에 복사
+
+    큐에 넣기 전에 호출한 쪽에서 실행되므로 출력 스레드에서도 원래 태스크의 값이 유지된다.
+    """
+
+    def filter(self, record):
+        started = current_started.get()
+        record.worker = current_worker.get()
+        record.property = current_property.get()
+        record.phase = current_phase.get()
+        record.list_page = current_list_page.get()
+        record.elapsed_s = round(time.perf_counter() - started, 1) if started else None
+        return True
+
+class ConsoleLogFormatter(logging.Formatter):
+    """기존 출력 형식에 매물 컨텍스트 접두어 추가 (예: [W2 2400000001 pay p3 +12.4s])"""
+
+    def format(self, record):
+        message = record.getMessage()
+        fields = []
+        if record.worker:
+            fields.append(f"W{record.worker}")
+        for value in (record.property, record.phase):
+            if value:
+                fields.append(str(value))
+        if record.list_page:
+            fields.append(f"p{record.list_page}")
+        if record.elapsed_s is not None:
+            fields.append(f"+{record.elapsed_s}s")
+        if not fields or not record.property:
+            return message
+        # 앞쪽 빈 줄(구분용)은 접두어 앞에 유지
+        body = message.lstrip('\n')
+        return message[:len(message) - len(body)] + f"[{' '.join(fields)}] {body}"
+
+class JsonLogFormatter(logging.Formatter):
+    """한 줄에 하나의 JSON 객체 (시각, 레벨, 메시지, 컨텍스트)"""
+
+    def format(self, record):
+        entry = {
+            'at': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'message': record.getMessage().strip()
+        }
+        for key in ('worker', 'property', 'phase', 'list_page', 'elapsed_s'):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        return json.dumps(entry, ensure_ascii=False)
+
+def setup_logging(shard_index=0, shard_count=1):
+    """로그를 큐에 넣고 별도 스레드에서 출력·기록하도록 설정 (여러 번 호출해도 한 번만 적용)
+
+    LOG_LEVEL(DEBUG/INFO/WARNING/ERROR), LOG_FORMAT(text/json), LOG_FILE(JSONL, 선택),
+    PROGRESS_PATH(진행 현황 JSONL, 선택). 이벤트 루프는 큐에 넣기만 하므로 출력 때문에 멈추지 않는다.
+    """
+    global _log_listener
+    if _log_listener:
+        return
+    is_progress = lambda record: record.name == progress_log.name
+    
+    console = logging.StreamHandler(sys.stdout)
+    console.setFormatter(JsonLogFormatter() if os.getenv('LOG_FORMAT', 'text').lower() == 'json' else ConsoleLogFormatter())
+    handlers = [console]
+    log_file = shard_suffix(os.getenv('LOG_FILE', ''), shard_index, shard_count)
+    if log_file:
+        os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(JsonLogFormatter())
+        handlers.append(file_handler)
+    for handler in handlers:
+        handler.addFilter(lambda record: not is_progress(record))
+    
+    progress_path = shard_suffix(os.getenv('PROGRESS_PATH', ''), shard_index, shard_count)
+    if progress_path:
+        os.makedirs(os.path.dirname(progress_path) or '.', exist_ok=True)
+        progress_handler = logging.FileHandler(progress_path, mode='w', encoding='utf-8')
+        progress_handler.setFormatter(logging.Formatter('%(message)s'))
+        progress_handler.addFilter(is_progress)
+        handlers.append(progress_handler)
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.addFilter(LogContext())
+    log.addHandler(queue_handler)
+    log.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+    log.propagate = False
+    progress_log.setLevel(logging.INFO)  # 진행 현황은 LOG_LEVEL과 무관하게 기록
+    
+    _log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)  # 종료 시 큐에 남은 로그까지 출력
+
+# 매물 테이블 전체를 한 번에 구조화된 레코드로 추출 (인자: SiteSelectors.row_snapshot_args())
+ROW_SNAPSHOT_JS = '''
+    (sel) => Array.from(document.querySelectorAll(sel.rows)).map((row, i) => {
+        const cells = row.querySelectorAll('td');
+        const text = (index) => cells[index] ? cells[index].innerText.trim() : '';
+        const numberCell = row.querySelector(sel.number);
+        return {
+            row: i + 1,
+            number: numberCell ? numberCell.innerText.trim() : null,
+            name: text(1),
+            trade_type: text(3),
+            price: text(4),
+            cell_count: cells.length,
+            has_end_button: !!row.querySelector(sel.end_button),
+            has_re_ad_button: !!row.querySelector(sel.re_ad_button)
+        };
+    })
+'''
+
+class SiteLayoutError(RuntimeError):
+    """필수 셀렉터가 사이트에서 사라져 더 진행해도 시간 초과만 반복되는 경우"""
+
+class SiteSelectors:
+    """사이트 셀렉터 모음 (이름 -> 대체 셀렉터 목록, 앞쪽이 기본)
+
+    대체 셀렉터들은 콤마로 합친 하나의 셀렉터로 미리 만들어 두어 한 번의 조회로 모두 확인한다.
+    wait()는 대체 셀렉터를 locator.or_()로 묶으므로 text= 같은 CSS가 아닌 셀렉터도 쓸 수 있다.
+    대기 시간 초과가 연속으로 쌓인 셀렉터는 고장으로 보고, 이후 매물은 기다리지 않고 바로 실패시키되
+    고장 판정 후 probe_after초가 지나면 한 건은 통과시켜 사이트가 복구됐는지 다시 확인한다.
+    바로 실패한 매물은 RetryPolicy의 site_layout 백오프(probe_after보다 김)로 재확인 이후에 다시 시도된다.
+    """
+
+    DEFAULTS = {
+        'login_id': ['#member-id'],
+        'login_pw': ['#member-pw'],
+        'login_submit': ['#integrated-login > a'],
+        'list_rows': ['table tbody tr'],
+        'row_number': ['td:nth-child(3) > div.numberN'],
+        'list_section': ['div.singleSection.listSection'],
+        'next_page': [
+            '#wrap > div > div > div > div.sectionWrap > div.singleSection.listSection > div.pagination > span:nth-child(5) > a',
+            'div.pagination a.next'
+        ],
+        'page_links': ['div.pagination a'],
+        'end_button': ['#naverEnd'],
+        'row_checkbox': ['td input[type="checkbox"]'],
+        'bulk_end_button': ['#naverEndAll', 'button:has-text("선택 노출종료")', 'a:has-text("선택 노출종료")'],
+        'ad_end_tab': ['.statusAdEnd', 'a:has-text("광고종료")'],
+        're_ad_button': ['#reReg'],
+        'register_button': ['button:has-text("광고하기")', 'a:has-text("광고하기")', 'text=광고하기'],
+        'payment_consent': ['#consentMobile2'],
+        'payment_button': ['#naverSendSave']
+    }
+
+    # 매물 목록 화면 시작 점검: 없으면 중단할 셀렉터 / 없으면 다른 방법으로 우회할 셀렉터
+    LIST_CRITICAL = ['list_rows', 'ad_end_tab']
+    LIST_OPTIONAL = ['next_page', 'page_links']
+
+    def __init__(self, overrides=None, broken_after=2, probe_after=30.0):
+        self.alternatives = dict(self.DEFAULTS)
+        for name, alternatives in (overrides or {}).items():
+            self.alternatives[name] = [alternatives] if isinstance(alternatives, str) else list(alternatives)
+        self.compiled = {name: ', '.join(alts) for name, alts in self.alternatives.items()}
+        self.overridden = set(overrides or {})
+        self.broken_after = broken_after
+        self.probe_after = probe_after
+        self.misses = {}  # 이름 -> 연속 시간 초과 횟수
+        self.broken_at = {}  # 이름 -> 고장 판정 후 처음 바로 실패시킨 시각 (monotonic)
+        self.unavailable = set()  # 시작 점검에서 찾지 못한 선택 셀렉터
+
+    def css(self, name):
+        return self.compiled[name]
+
+    def row_snapshot_args(self):
+        return {
+            'rows': self.css('list_rows'),
+            'number': self.css('row_number'),
+            'end_button': self.css('end_button'),
+            're_ad_button': self.css('re_ad_button')
+        }
+
+    def hit(self, name):
+        self.misses[name] = 0
+        self.broken_at.pop(name, None)
+
+    def miss(self, name):
+        self.misses[name] = self.misses.get(name, 0) + 1
+
+    def broken(self):
+        return [name for name, count in self.misses.items() if count >= self.broken_after]
+
+    def reset(self):
+        """고장 판정 초기화 (데몬 배치 시작 시)"""
+        self.misses.clear()
+        self.broken_at.clear()
+
+    def ensure_healthy(self):
+        """고장으로 판정된 셀렉터가 있으면 즉시 SiteLayoutError (probe_after초마다 한 건은 통과)"""
+        broken = self.broken()
+        now = time.monotonic()
+        for name in broken:
+            self.broken_at.setdefault(name, now)
+        if broken and all(now - self.broken_at[name] >= self.probe_after for name in broken):
+            # 한 번 더 시간 초과면 다시 고장, 찾으면 hit()로 정상 복귀
+            for name in broken:
+                self.misses[name] = self.broken_after - 1
+                self.broken_at.pop(name)
+            log.info(f"🔎 고장 셀렉터 재확인: {', '.join(broken)}")
+            return
+        if broken:
+            raise SiteLayoutError(f"사이트 구조 변경 의심 - 셀렉터 연속 시간 초과: {', '.join(broken)}")
+
+    async def wait(self, page, name, timeout, state='visible'):
+        """셀렉터 대기 (대체 셀렉터 중 먼저 나타나는 요소, 성공/시간 초과를 고장 판정에 반영)"""
+        alternatives = self.alternatives[name]
+        locator = page.locator(alternatives[0])
+        for alternative in alternatives[1:]:
+            locator = locator.or_(page.locator(alternative))
+        try:
+            await locator.first.wait_for(state=state, timeout=timeout)
+        except PlaywrightTimeoutError:
+            self.miss(name)
+            raise
+        self.hit(name)
+        return await locator.first.element_handle()
+
+    async def health_check(self, page, names):
+        """현재 화면에서 이름별로 처음 일치하는 대체 셀렉터 (없으면 None)"""
+        found = {}
+        for name in names:
+            found[name] = None
+            for alternative in self.alternatives[name]:
+                if await page.locator(alternative).count():
+                    found[name] = alternative
+                    break
+        return found
+
+class AdListIndex:
+    """매물번호 → (페이지, 행) 위치 인덱스
+
+    실행당 한 번 매물 리스트를 순회해 만들고, 이후 검색 중 읽은 페이지로
+    해당 페이지 항목만 증분 갱신한다. 위치는 힌트이므로 도착 후 반드시 재확인한다.
+    """
 
-class MultiPropertyAutomation:
     def __init__(self):
+        self.entries = {}  # 매물번호 -> (페이지, 행)
+        self.pages = {}    # 페이지 -> [매물번호, ...]
+        self.exposed = {}  # 매물번호 -> 노출종료 버튼 유무 (현재 노출 중인지)
+        self.complete = False  # 마지막 페이지까지 순회했는지
+
+    def __len__(self):
+        return len(self.entries)
+
+    def update_page(self, page_no, rows):
+        """한 페이지에서 읽은 (행, 매물번호, 노출 여부) 목록으로 해당 페이지 항목 교체"""
+        for number in self.pages.get(page_no, []):
+            if self.entries.get(number, (None, None))[0] == page_no:
+                del self.entries[number]
+
+        self.pages[page_no] = [number for _, number, _ in rows]
+        for row_no, number, exposed in rows:
+            self.entries[number] = (page_no, row_no)
+            self.exposed[number] = exposed
+
+    def _resolve(self, property_number):
+        # 기존 검색과 같은 부분일치 규칙 유지
+        if property_number in self.entries:
+            return property_number
+        for number in self.entries:
+            if property_number in number:
+                return number
+        return None
+
+    def lookup(self, property_number):
+        """매물 위치 (페이지, 행) 조회, 없으면 None"""
+        number = self._resolve(property_number)
+        return self.entries[number] if number else None
+
+    def is_exposed(self, property_number):
+        """현재 노출 중(노출종료 버튼 있음)인지, 인덱스에 없으면 None"""
+        number = self._resolve(property_number)
+        return self.exposed.get(number) if number else None
+
+    def exposed_count(self):
+        """노출종료 버튼이 있는(노출 중인) 매물 수"""
+        return sum(1 for number in self.entries if self.exposed.get(number))
+
+    def remove(self, property_number):
+        """처리 완료 등으로 목록에서 빠진 매물 제거"""
+        number = self._resolve(property_number)
+        if not number:
+            return
+        page_no, _ = self.entries.pop(number)
+        if number in self.pages.get(page_no, []):
+            self.pages[page_no].remove(number)
+
+class PageWaiter:
+    """고정 대기 대신 실제 신호(네트워크, 셀렉터, URL, 테이블 변화)로 대기
+
+    모든 대기는 상한 시간(ms)을 가지며, 시간 초과 시 예외 없이 False를 반환한다.
+    """
+
+    # 매물 테이블의 행 수 + 첫 매물번호 (페이지/목록 전환 감지용, 셀렉터는 SiteSelectors에서 전달)
+    TABLE_SIGNATURE_JS = '''
+        (selectors) => {
+            const rows = document.querySelectorAll(selectors.rows);
+            for (const row of rows) {
+                const number = row.querySelector(selectors.number);
+                if (number) return rows.length + '|' + number.innerText.trim();
+            }
+            return rows.length + '|';
+        }
+    '''
+
+    def __init__(self, selectors):
+        self.table_selectors = {'rows': selectors.css('list_rows'), 'number': selectors.css('row_number')}
+
+    async def network_idle(self, page, timeout):
+        """네트워크 요청이 잦아들 때까지 대기"""
+        try:
+            await page.wait_for_load_state('networkidle', timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def selector(self, page, selector, state='visible', timeout=10000):
+        """셀렉터가 지정 상태(attached/visible/hidden/detached)가 될 때까지 대기"""
+        try:
+            await page.wait_for_selector(selector, state=state, timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def url(self, page, url, timeout):
+        """URL이 패턴(문자열/함수)과 일치할 때까지 대기"""
+        try:
+            await page.wait_for_url(url, timeout=timeout)
+            return True
+        except Exception:
+            return False
+
+    async def table_signature(self, page):
+        try:
+            return await page.evaluate(self.TABLE_SIGNATURE_JS, self.table_selectors)
+        except Exception:
+            return None
+
+    async def table_change(self, page, before, timeout):
+        """매물 테이블이 이전 상태(before)와 달라질 때까지 대기"""
+        try:
+            await page.wait_for_function(
+                f"(arg) => ({self.TABLE_SIGNATURE_JS})(arg) !== arg.before",
+                arg={**self.table_selectors, 'before': before},
+                timeout=timeout
+            )
+            return True
+        except Exception:
+            # 전체 페이지 이동으로 실행 컨텍스트가 바뀐 경우 등
+            return False
+
+class DialogDispatcher:
+    """페이지당 하나만 등록되는 팝업(dialog) 처리기
+
+    모든 팝업을 즉시 확인(accept)하고, 팝업을 기다리는 호출자에게는 future로 전달한다.
+    리스너를 매번 등록/해제하지 않으므로 여러 핸들러가 같은 팝업을 두고 경합하지 않는다.
+    """
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.waiters = []
+        self.handled_count = 0
+
+    def attach(self, page):
+        page.on('dialog', self.handle)
+        return self
+
+    async def handle(self, dialog):
+        dialog_type, message = dialog.type, dialog.message
+        log.debug(f"🚨 팝업 감지: {dialog_type} - '{message}'")
+        self.metrics.count(f"dialog_{dialog_type}")
+        try:
+            if dialog_type == 'prompt':
+                await dialog.accept("")  # 빈 값으로 확인
+            else:
+                await dialog.accept()
+            log.debug("✅ 팝업 확인 완료")
+        except Exception as e:
+            log.error(f"❌ 팝업 처리 중 오류: {e}")
+            try:
+                await dialog.dismiss()
+                log.debug("🔄 팝업 취소로 처리")
+            except Exception:
+                log.error("❌ 팝업 처리 실패")
+        self.handled_count += 1
+
+        # 가장 먼저 등록된 대기자에게 전달
+        while self.waiters:
+            waiter = self.waiters.pop(0)
+            if not waiter.done():
+                waiter.set_result({'type': dialog_type, 'message': message})
+                break
+
+    def expect(self):
+        """다음 팝업을 받을 future 등록 (팝업을 유발하는 동작 전에 호출)"""
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        return waiter
+
+    async def wait(self, waiter, timeout):
+        """팝업이 도착할 때까지 대기 (시간 초과 시 None)"""
+        try:
+            return await asyncio.wait_for(asyncio.shield(waiter), timeout / 1000)
+        except asyncio.TimeoutError:
+            waiter.cancel()
+            return None
+        finally:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+
+    async def click_expect(self, element, timeout, **click_options):
+        """요소 클릭 후 팝업이 실제로 발생할 때까지 대기 (발생한 팝업 정보 또는 None)"""
+        waiter = self.expect()
+        try:
+            await element.click(**click_options)
+        except Exception:
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+            waiter.cancel()
+            raise
+        return await self.wait(waiter, timeout)
+
+class NavigationState:
+    """페이지가 지금 어떤 화면(광고중 목록/종료 목록/검색 결과)의 몇 페이지에 있는지 추적
+
+    기록 당시 URL과 현재 URL이 다르거나 목록 내용을 바꾸는 작업(노출종료, 결제) 뒤에는
+    무효로 보고, 유효한 동안에는 같은 화면으로의 전체 재이동을 생략한다.
+    """
+
+    def __init__(self):
+        self.view = None
+        self.page_no = None
+        self.url = None
+
+    def set(self, page, view, page_no=1):
+        self.view = view
+        self.page_no = page_no
+        self.url = page.url
+        current_list_page.set(page_no if view == 'active' else None)
+
+    def invalidate(self):
+        self.view = self.page_no = self.url = None
+        current_list_page.set(None)
+
+    def is_on(self, page, view, page_no=None):
+        if self.view != view or self.url != page.url:
+            return False
+        return page_no is None or self.page_no == page_no
+
+class ResourceBlocker:
+    """리소스 타입/URL 패턴 기반 네트워크 요청 차단 (컨텍스트 단위 route)
+
+    허용 패턴이 차단 규칙보다 우선한다. URL 패턴은 fnmatch 형식(*, ?)이며,
+    'image:*popup*'처럼 리소스 타입을 앞에 붙이면 해당 타입 요청에만 적용된다.
+    """
+
+    def __init__(self, resource_types, deny_patterns, allow_patterns):
+        self.resource_types = set(resource_types)
+        self.deny_patterns = [self.split_pattern(pattern) for pattern in deny_patterns]
+        self.allow_patterns = allow_patterns
+        self.blocked_count = 0
+
+    @staticmethod
+    def split_pattern(pattern):
+        """'타입:패턴' -> (타입, 패턴), 타입이 없으면 (None, 패턴)"""
+        resource_type, sep, url_pattern = pattern.partition(':')
+        if sep and resource_type.isalpha() and not url_pattern.startswith('//'):
+            return resource_type, url_pattern
+        return None, pattern
+
+    def should_block(self, resource_type, url):
+        if any(fnmatch.fnmatch(url, pattern) for pattern in self.allow_patterns):
+            return False
+        if resource_type in self.resource_types:
+            return True
+        return any(
+            fnmatch.fnmatch(url, pattern)
+            for only_type, pattern in self.deny_patterns
+            if only_type in (None, resource_type)
+        )
+
+    async def handle_route(self, route):
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked_count += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def attach(self, context):
+        await context.route('**/*', self.handle_route)
+
+class OverlaySuppressor:
+    """팝업 오버레이 자동 숨김 (컨텍스트 init script + MutationObserver)
+
+    DOM 전체를 훑는 대신 새로 삽입되는 노드만 검사해 팝업을 숨긴다.
+    결제 등 다른 화면의 모달은 건드리지 않도록 지정한 경로에서만 동작한다.
+    """
+
+    POPUP_SELECTOR = 'img[src*="popup"], div[class*="popup"], div[id*="popup"], .modal, .overlay'
+
+    SCRIPT_TEMPLATE = '''
+        (() => {
+            if (window.__overlaySuppressor) return;
+            const paths = %(paths)s;
+            if (!paths.some(path => location.pathname.includes(path))) return;
+
+            const POPUP_SELECTOR = %(selector)s;
+            let hiddenCount = 0;
+
+            const hide = (el) => {
+                if (el.dataset.overlaySuppressed) return;
+                el.dataset.overlaySuppressed = '1';
+                el.style.setProperty('display', 'none', 'important');
+                el.style.setProperty('visibility', 'hidden', 'important');
+                hiddenCount++;
+            };
+
+            // 로드 이후 동적으로 삽입된 최상위 노드만 z-index 검사
+            const isBlockingLayer = (el) => {
+                const style = window.getComputedStyle(el);
+                return parseInt(style.zIndex) > 1000 && (style.position === 'fixed' || style.position === 'absolute');
+            };
+
+            const check = (node) => {
+                if (node.nodeType !== 1) return;
+                if (node.matches(POPUP_SELECTOR)) {
+                    hide(node);
+                    return;
+                }
+                node.querySelectorAll(POPUP_SELECTOR).forEach(hide);
+                if (document.readyState !== 'loading' && isBlockingLayer(node)) hide(node);
+            };
+
+            // 직전 확인 이후 숨긴 수 반환
+            const sweep = () => {
+                document.querySelectorAll(POPUP_SELECTOR).forEach(hide);
+                const count = hiddenCount;
+                hiddenCount = 0;
+                return count;
+            };
+
+            new MutationObserver((mutations) => {
+                for (const mutation of mutations) mutation.addedNodes.forEach(check);
+            }).observe(document, { childList: true, subtree: true });
+            document.addEventListener('DOMContentLoaded', sweep);
+
+            window.__overlaySuppressor = { sweep };
+        })();
+    '''
+
+    def __init__(self, paths):
+        self.script = self.SCRIPT_TEMPLATE % {
+            'paths': json.dumps(paths),
+            'selector': json.dumps(self.POPUP_SELECTOR)
+        }
+
+    async def attach(self, context):
+        await context.add_init_script(script=self.script)
+
+    async def sweep(self, page):
+        """직전 확인 이후 숨김 처리된 팝업 수 반환 (init script가 없는 페이지는 즉시 설치)"""
+        try:
+            count = await page.evaluate("() => window.__overlaySuppressor ? window.__overlaySuppressor.sweep() : null")
+            if count is None:
+                await page.evaluate(self.script)
+                count = await page.evaluate("() => window.__overlaySuppressor ? window.__overlaySuppressor.sweep() : 0")
+            return count
+        except Exception as e:
+            log.warning(f"⚠️ 팝업 오버레이 처리 중 오류: {e}")
+            return 0
+
+class ArtifactCapture:
+    """정책 기반 스크린샷 저장 (JPEG/영역 캡처, 백그라운드 쓰기, 용량 상한 초과 시 오래된 파일 삭제)
+
+    정책: off(저장 안 함), failure(실패 시에만), sampled(실패 + 성공의 일부 비율), always(모두)
+    """
+
+    POLICIES = ('off', 'failure', 'sampled', 'always')
+    EXTENSIONS = ('.jpg', '.png')  # 이 클래스가 저장하는 확장자 (정리 대상)
+
+    def __init__(self, directory, policy='failure', sample_rate=0.1, image_format='jpeg', quality=70, budget_mb=50):
+        if policy not in self.POLICIES:
+            log.warning(f"⚠️ 알 수 없는 CAPTURE_POLICY '{policy}' - failure로 동작")
+            policy = 'failure'
+        self.directory = directory
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.image_format = 'png' if image_format == 'png' else 'jpeg'
+        self.quality = quality
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.captured_count = 0
+        self.rotated_count = 0
+        self._writes = set()
+        self._lock = threading.Lock()
+
+    def should_capture(self, failure):
+        if self.policy == 'off':
+            return False
+        if failure or self.policy == 'always':
+            return True
+        return self.policy == 'sampled' and random.random() < self.sample_rate
+
+    async def capture(self, page, name, failure=False, locator=None):
+        """조건에 맞으면 화면(또는 locator 영역)을 캡처해 백그라운드로 저장 (저장 경로 또는 None)"""
+        if not self.should_capture(failure):
+            return None
+        
+        options = {'type': self.image_format}
+        if self.image_format == 'jpeg':
+            options['quality'] = self.quality
+        try:
+            if locator is not None:
+                data = await locator.screenshot(timeout=5000, **options)
+            else:
+                data = await page.screenshot(**options)  # 전체 페이지가 아닌 현재 화면만
+        except Exception as e:
+            log.warning(f"⚠️ 스크린샷 실패 ({name}): {e}")
+            return None
+        
+        path = os.path.join(self.directory, f"{name}.{'jpg' if self.image_format == 'jpeg' else 'png'}")
+        task = asyncio.create_task(asyncio.to_thread(self._write, path, data))
+        self._writes.add(task)
+        task.add_done_callback(self._writes.discard)
+        self.captured_count += 1
+        return path
+
+    def _write(self, path, data):
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+            self._rotate()
+
+    def _rotate(self):
+        """디렉터리의 스크린샷 용량이 상한을 넘으면 오래된 스크린샷부터 삭제 (다른 파일은 건드리지 않음)"""
+        if not self.budget_bytes:
+            return
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and os.path.splitext(entry.name)[1].lower() in self.EXTENSIONS:
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.budget_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                self.rotated_count += 1
+            except OSError:
+                pass
+
+    async def flush(self):
+        """진행 중인 백그라운드 저장 완료 대기"""
+        if self._writes:
+            await asyncio.gather(*self._writes, return_exceptions=True)
+
+class AdListParser(HTMLParser):
+    """매물 리스트 HTML에서 ROW_SNAPSHOT_JS와 같은 행 정보와 다음 페이지 버튼 상태 추출
+
+    기본 셀렉터 구조(tbody 행, 3번째 칸의 div.numberN, #naverEnd/#reReg, 페이지네이션 5번째 span의 링크)를 따른다.
+    SELECTORS 중 하나라도 SELECTOR_OVERRIDES로 바뀌면 이 구조를 믿을 수 없으므로 HTTP 목록 조회를 쓰지 않는다.
+    """
+
+    SELECTORS = ('list_rows', 'row_number', 'end_button', 're_ad_button', 'next_page')
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self.next_class = None  # 다음 페이지 링크의 class (없으면 None)
+        self._tbody_depth = 0
+        self._row = None
+        self._number_depth = 0  # div.numberN 안의 div 중첩 깊이 (0이면 밖)
+        self._pagination_depth = 0
+        self._span_count = 0
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if tag == 'tbody':
+            self._tbody_depth += 1
+        elif tag == 'tr' and self._tbody_depth:
+            self._row = {'row': len(self.rows) + 1, 'number': '', 'cell_count': 0,
+                         'has_end_button': False, 'has_re_ad_button': False}
+            self.rows.append(self._row)
+        elif tag == 'td' and self._row is not None:
+            self._row['cell_count'] += 1
+        elif tag == 'div':
+            if self._number_depth:
+                self._number_depth += 1
+            elif 'numberN' in classes and self._row is not None and self._row['cell_count'] == 3:
+                self._number_depth = 1
+            if self._pagination_depth:
+                self._pagination_depth += 1
+            elif 'pagination' in classes:
+                self._pagination_depth = 1
+        elif tag == 'span' and self._pagination_depth == 1:
+            self._span_count += 1
+        elif tag == 'a' and self._pagination_depth == 1 and self._span_count == 5:
+            self.next_class = attrs.get('class') or ''
+        
+        if self._row is not None:
+            if attrs.get('id') == 'naverEnd':
+                self._row['has_end_button'] = True
+            elif attrs.get('id') == 'reReg':
+                self._row['has_re_ad_button'] = True
+
+    def handle_endtag(self, tag):
+        if tag == 'tbody' and self._tbody_depth:
+            self._tbody_depth -= 1
+            self._row = None
+        elif tag == 'div':
+            if self._number_depth:
+                self._number_depth -= 1
+            if self._pagination_depth:
+                self._pagination_depth -= 1
+
+    def handle_data(self, data):
+        if self._number_depth and self._row is not None:
+            self._row['number'] += data.strip()
+
+class AdListHttpClient:
+    """브라우저 없이 로그인 쿠키로 매물 리스트 HTML을 직접 받아 파싱 (keep-alive 연결 재사용)
+
+    여러 워커가 함께 쓰므로 요청은 잠금으로 한 번에 하나씩 보낸다.
+    """
+
+    def __init__(self, list_url_template, cookies, user_agent, timeout=15):
+        self.list_url_template = list_url_template
+        self.user_agent = user_agent
+        self.timeout = timeout
+        self.cookies = {cookie['name']: cookie for cookie in cookies}
+        self.request_count = 0
+        self._connection = None
+        self._origin = None
+        self._lock = threading.Lock()
+
+    def _cookie_header(self, host, path):
+        pairs = []
+        for cookie in self.cookies.values():
+            domain = cookie.get('domain', '').lstrip('.')
+            if (host == domain or host.endswith('.' + domain)) and path.startswith(cookie.get('path') or '/'):
+                pairs.append(f"{cookie['name']}={cookie['value']}")
+        return '; '.join(pairs)
+
+    def _connect(self, scheme, netloc):
+        if self._connection is None or self._origin != (scheme, netloc):
+            if self._connection:
+                self._connection.close()
+            connection_class = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            self._connection = connection_class(netloc, timeout=self.timeout)
+            self._origin = (scheme, netloc)
+        return self._connection
+
+    def _get(self, url):
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        target = path + (f"?{parts.query}" if parts.query else '')
+        headers = {
+            'User-Agent': self.user_agent,
+            'Accept': 'text/html,application/xhtml+xml',
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive',
+            'Cookie': self._cookie_header(parts.hostname, path)
+        }
+        for attempt in range(2):
+            connection = self._connect(parts.scheme, parts.netloc)
+            try:
+                connection.request('GET', target, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                # 서버가 유휴 연결을 끊은 경우 한 번만 다시 연결
+                connection.close()
+                self._connection = None
+                if attempt:
+                    raise
+        self.request_count += 1
+        
+        for header in response.headers.get_all('Set-Cookie') or []:
+            for name, morsel in SimpleCookie(header).items():
+                self.cookies[name] = {'name': name, 'value': morsel.value,
+                                      'domain': morsel['domain'] or parts.hostname, 'path': morsel['path'] or '/'}
+        
+        if response.status in (301, 302, 303, 307, 308):
+            location = response.headers.get('Location', '')
+            if 'login' in location.lower():
+                raise RuntimeError("HTTP 목록 조회: 로그인 세션이 만료되었습니다.")
+            return self._get(urljoin(url, location))
+        if response.status != 200:
+            raise RuntimeError(f"HTTP 목록 조회 실패: {response.status}")
+        
+        if response.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        charset = response.headers.get_content_charset() or 'utf-8'
+        return body.decode(charset, errors='replace')
+
+    def fetch_page(self, page_no):
+        """목록 page_no페이지의 (매물 행 목록, 마지막 페이지 여부)"""
+        with self._lock:
+            html = self._get(self.list_url_template.format(page=page_no))
+        parser = AdListParser()
+        parser.feed(html)
+        parser.close()
+        rows = [row for row in parser.rows if row['number']]
+        # 비활성화된 다음 링크를 본 경우에만 마지막 페이지 (페이지네이션이 없으면 구조 변경일 수 있음)
+        is_last = parser.next_class is not None and 'disabled' in parser.next_class
+        return rows, is_last
+
+    def close(self):
+        if self._connection:
+            self._connection.close()
+            self._connection = None
+
+class SessionCache:
+    """로그인 세션(storage_state) 디스크 캐시
+
+    저장 시각과 로그인 ID를 함께 기록하고, 만료되었거나 다른 계정의 세션은 무시한다.
+    """
+
+    def __init__(self, path, max_age, login_id):
+        self.path = path
+        self.max_age = max_age
+        self.login_id = login_id
+
+    def load(self):
+        """유효한 캐시 세션 반환, 없거나 만료되었으면 None"""
+        if not self.path:
+            return None
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if data.get('login_id') != self.login_id:
+            return None
+
+        age = time.time() - data.get('saved_at', 0)
+        if age > self.max_age:
+            log.info(f"⌛ 저장된 세션 만료 ({age/60:.0f}분 경과)")
+            return None
+        return data.get('storage_state')
+
+    def save(self, storage_state):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'saved_at': time.time(),
+                    'login_id': self.login_id,
+                    'storage_state': storage_state
+                }, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+            log.info(f"💾 로그인 세션 저장: {self.path}")
+        except OSError as e:
+            log.warning(f"⚠️ 로그인 세션 저장 실패: {e}")
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+class RunJournal:
+    """매물별 실제 업데이트 단계 기록 (append-only JSONL)
+
+    같은 실행 ID(기본: 실행마다 새 ID)의 기록만 읽어, 재시작 시 완료된 매물은 건너뛰고
+    중단된 매물은 마지막 완료 단계 이후부터 이어서 처리한다.
+    """
+
+    PHASES = ['end', 'ad_end', 're_ad', 'register', 'pay']
+
+    def __init__(self, path, run_id):
+        self.path = path
+        self.run_id = run_id
+        self.progress = {}  # 매물번호 -> {단계: 상태}
+        self._needs_newline = False
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                for line in f:
+                    self._needs_newline = not line.endswith('\n')
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 중단 시 잘린 마지막 줄
+                    if entry.get('run_id') == self.run_id:
+                        self.progress.setdefault(entry['property'], {})[entry['phase']] = entry['status']
+        except OSError:
+            pass
+
+    def record(self, property_number, phase, status='done'):
+        self.progress.setdefault(property_number, {})[phase] = status
+        entry = {
+            'run_id': self.run_id,
+            'property': property_number,
+            'phase': phase,
+            'status': status,
+            'at': datetime.now().isoformat(timespec='seconds')
+        }
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if self._needs_newline:
+                f.write('\n')
+                self._needs_newline = False
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def last_completed(self, property_number):
+        """마지막으로 완료된 단계, 없으면 None"""
+        phases = self.progress.get(property_number, {})
+        completed = [phase for phase in self.PHASES if phases.get(phase) == 'done']
+        return completed[-1] if completed else None
+
+    def is_complete(self, property_number):
+        return self.last_completed(property_number) == 'pay'
+
+    def payment_uncertain(self, property_number):
+        """결제 클릭 후 완료 기록 전에 중단된 경우"""
+        phases = self.progress.get(property_number, {})
+        return phases.get('pay') == 'started'
+
+class RunMetrics:
+    """단계별 소요 시간·이벤트 수집 및 JSON 실행 리포트 생성"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """새 실행(배치) 기준으로 수집 내용 초기화"""
+        self.started_at = datetime.now()
+        self.started = time.perf_counter()
+        self.events = []
+        self.counters = {}
+        self.outcome = {}
+
+    def record(self, name, since, status='ok', **fields):
+        """since(perf_counter 값)부터 지금까지의 단계 소요 시간 기록"""
+        now = time.perf_counter()
+        event = {
+            'phase': name,
+            'property': current_property.get(),
+            'status': status,
+            'offset_ms': round((since - self.started) * 1000),
+            'duration_ms': round((now - since) * 1000)
+        }
+        event.update(fields)
+        self.events.append(event)
+
+    @contextlib.contextmanager
+    def phase(self, name, **fields):
+        """with 블록 소요 시간 기록 (예외 시 status=error)"""
+        since = time.perf_counter()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            self.record(name, since, status, **fields)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def summary(self):
+        """단계별 횟수/오류/합계/평균/p50/p95/최대 (ms)"""
+        durations = {}
+        errors = {}
+        for event in self.events:
+            durations.setdefault(event['phase'], []).append(event['duration_ms'])
+            if event['status'] != 'ok':
+                errors[event['phase']] = errors.get(event['phase'], 0) + 1
+
+        summary = {}
+        for name, values in durations.items():
+            values = sorted(values)
+            summary[name] = {
+                'count': len(values),
+                'errors': errors.get(name, 0),
+                'total_ms': sum(values),
+                'avg_ms': round(sum(values) / len(values)),
+                'p50_ms': values[len(values) // 2],
+                'p95_ms': values[min(len(values) - 1, int(len(values) * 0.95))],
+                'max_ms': values[-1]
+            }
+        return summary
+
+    def write_report(self, path):
+        report = {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'elapsed_s': round(time.perf_counter() - self.started, 1),
+            'outcome': self.outcome,
+            'phases': self.summary(),
+            'counters': self.counters,
+            'events': self.events
+        }
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+class ProgressFeed:
+    """완료/실패/재시도 대기/처리 중 건수와 남은 예상 시간(ETA) 집계
+
+    상태가 바뀔 때마다 스냅숏 한 줄을 진행 현황 로그(PROGRESS_PATH JSONL)로 내보내며,
+    상주 모드에서는 status 요청으로도 조회할 수 있다.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self, total=None, skipped=0):
+        self.total = total
+        self.skipped = skipped
+        self.done = 0
+        self.failed = 0
+        self.waiting_retry = set()
+        self.in_flight = {}  # 매물번호 -> 워커 번호
+        self.started = time.perf_counter()
+        self.finished = False
+
+    def start(self, property_number, worker_id):
+        self.waiting_retry.discard(property_number)
+        self.in_flight[property_number] = worker_id
+        self.emit()
+
+    def finish(self, property_number, status):
+        """status: done / failed / retry"""
+        self.in_flight.pop(property_number, None)
+        if status == 'done':
+            self.done += 1
+        elif status == 'failed':
+            self.failed += 1
+        else:
+            self.waiting_retry.add(property_number)
+        self.emit()
+
+    def snapshot(self):
+        elapsed = time.perf_counter() - self.started
+        completed = self.done + self.failed
+        rate = completed / elapsed if completed and elapsed else None
+        remaining = None if self.total is None else max(0, self.total - completed)
+        return {
+            'at': datetime.now().isoformat(timespec='seconds'),
+            'elapsed_s': round(elapsed, 1),
+            'total': self.total,
+            'done': self.done,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'retrying': len(self.waiting_retry),
+            'in_flight': len(self.in_flight),
+            'in_flight_properties': self.in_flight,
+            'per_minute': round(rate * 60, 2) if rate else None,
+            'eta_s': round(remaining / rate) if rate and remaining is not None else None,
+            'finished': self.finished
+        }
+
+    def emit(self):
+        progress_log.info(json.dumps(self.snapshot(), ensure_ascii=False))
+
+    def close(self):
+        self.finished = True
+        self.emit()
+
+class RetryPolicy:
+    """실패 유형별 재시도 횟수와 백오프 (지수 증가, 상한 있음)
+
+    유형: selector_timeout, dialog_missing, pagination_error, navigation_timeout,
+    login_lost, not_found, payment_uncertain, site_layout, unknown
+    """
+
+    # 유형 -> (최대 재시도 횟수, 첫 대기 초)
+    DEFAULTS = {
+        'selector_timeout': (2, 2.0),
+        'dialog_missing': (2, 1.0),
+        'pagination_error': (2, 3.0),
+        'navigation_timeout': (3, 5.0),
+        'login_lost': (1, 0.0),
+        'not_found': (1, 3.0),
+        'payment_uncertain': (0, 0.0),  # 이중 결제 위험 - 재시도하지 않음
+        'site_layout': (2, 45.0),  # 셀렉터 고장 판정 - 재확인(SiteSelectors.probe_after) 이후로 미뤄 재시도
+        'unknown': (1, 3.0)
+    }
+
+    def __init__(self, overrides=None, multiplier=2.0, max_delay=60.0):
+        self.rules = dict(self.DEFAULTS)
+        for kind, (retries, delay) in (overrides or {}).items():
+            self.rules[kind] = (int(retries), float(delay))
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+
+    def next_delay(self, kind, attempt):
+        """attempt회 시도 후 재시도 대기 시간(초), 예산을 모두 쓰면 None"""
+        retries, delay = self.rules.get(kind, self.rules['unknown'])
+        if attempt > retries:
+            return None
+        return min(self.max_delay, delay * self.multiplier ** (attempt - 1))
+
+    @staticmethod
+    def classify(error):
+        """예외 메시지로 실패 유형 추정"""
+        if isinstance(error, SiteLayoutError):
+            return 'site_layout'
+        message = str(error).lower()
+        if isinstance(error, PlaywrightTimeoutError) or 'timeout' in message:
+            if any(keyword in message for keyword in ('goto', 'wait_for_url', 'navigat', 'wait_for_load_state')):
+                return 'navigation_timeout'
+            return 'selector_timeout'
+        return 'unknown'
+
+class RateLimiter:
+    """모든 워커가 공유하는 매물 처리 시작 간격 제한"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_start > now:
+                await asyncio.sleep(self._next_start - now)
+            self._next_start = max(now, self._next_start) + self.interval
+
+    # 고정 간격 모드는 동시 처리 수를 조절하지 않음
+    async def acquire(self):
+        pass
+
+    async def release(self):
+        pass
+
+    async def feedback(self, success, kind=None):
+        pass
+
+class ResponseMonitor:
+    """문서/XHR 응답 지연과 서버 오류 수집 (적응형 처리 속도 조절의 입력)"""
+
+    RESOURCE_TYPES = ('document', 'xhr', 'fetch')
+
+    def __init__(self, blocker=None):
+        self.latencies = []
+        self.errors = 0
+        self.blocker = blocker  # ResourceBlocker가 중단시킨 요청은 오류로 세지 않음
+
+    def attach(self, page):
+        page.on('requestfinished', self._on_finished)
+        page.on('requestfailed', self._on_failed)
+        page.on('response', self._on_response)
+        return page
+
+    def observe(self, latency_ms=None, error=False):
+        if latency_ms is not None:
+            self.latencies.append(latency_ms)
+        if error:
+            self.errors += 1
+
+    def _on_finished(self, request):
+        if request.resource_type in self.RESOURCE_TYPES:
+            response_end = (request.timing or {}).get('responseEnd', -1)
+            if response_end >= 0:
+                self.observe(response_end)
+
+    def _on_failed(self, request):
+        # 페이지 이동으로 취소된 요청(ERR_ABORTED)과 차단 규칙으로 중단한 요청(ERR_FAILED)은 서버 상태와 무관
+        if request.resource_type not in self.RESOURCE_TYPES or 'ERR_ABORTED' in (request.failure or ''):
+            return
+        if self.blocker and self.blocker.should_block(request.resource_type, request.url):
+            return
+        self.observe(error=True)
+
+    def _on_response(self, response):
+        if response.request.resource_type in self.RESOURCE_TYPES and (response.status >= 500 or response.status == 429):
+            self.observe(error=True)
+
+    def drain(self):
+        """마지막 조회 이후 수집분 (지연 목록 ms, 오류 수) 반환 후 비움"""
+        latencies, errors = self.latencies, self.errors
+        self.latencies, self.errors = [], 0
+        return latencies, errors
+
+class AdaptiveThrottle(RateLimiter):
+    """응답 지연·오류율에 따라 매물 처리 간격과 동시 처리 워커 수를 AIMD로 조절
+
+    매물 1건이 끝날 때마다 그동안의 응답을 평가해, 정상이면 간격을 step초씩 줄이고 한 바퀴(동시 처리 수만큼)
+    연속 정상이면 동시 처리 수를 1 늘린다. 서버 오류, 느린 응답(중앙값 > target_ms), 부하성 실패가 있으면
+    간격을 2배로 늘리고 동시 처리 수를 절반으로 줄인다. 모든 값은 설정 범위 안에서만 움직인다.
+    """
+
+    # 사이트 부하로 생기는 실패 유형 (매물 없음·결제 불확실 등은 속도와 무관)
+    CONGESTION_KINDS = {'selector_timeout', 'dialog_missing', 'pagination_error', 'navigation_timeout'}
+
+    def __init__(self, interval, min_interval, max_interval, max_concurrency, monitor, metrics,
+                 target_ms=2000, step=0.5):
+        super().__init__(min(max(interval, min_interval), max_interval))
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.monitor = monitor
+        self.metrics = metrics
+        self.target_ms = target_ms
+        self.step = step
+        self.active = 0
+        self.good_streak = 0
+        self.backoffs = 0
+        self.fastest_interval = self.interval
+        self._slots = asyncio.Condition()
+
+    async def acquire(self):
+        """동시 처리 수 한도 안에서 처리 슬롯 확보"""
+        async with self._slots:
+            await self._slots.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self):
+        async with self._slots:
+            self.active -= 1
+            self._slots.notify_all()
+
+    async def feedback(self, success, kind=None):
+        """매물 1건 결과와 그동안의 응답 지연/오류로 간격·동시 처리 수 조정"""
+        latencies, errors = self.monitor.drain()
+        median_ms = sorted(latencies)[len(latencies) // 2] if latencies else None
+        congested = (
+            errors > 0
+            or (median_ms is not None and median_ms > self.target_ms)
+            or (not success and kind in self.CONGESTION_KINDS)
+        )
+        before = (self.interval, self.limit)
+        async with self._slots:
+            if congested:
+                self.interval = min(self.max_interval, max(self.interval, self.step) * 2)
+                self.limit = max(1, self.limit // 2)
+                self.good_streak = 0
+                self.backoffs += 1
+                self.metrics.count('throttle_backoff')
+            else:
+                self.interval = max(self.min_interval, self.interval - self.step)
+                self.good_streak += 1
+                if self.good_streak >= self.limit and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self.good_streak = 0
+            self.fastest_interval = min(self.fastest_interval, self.interval)
+            self._slots.notify_all()
+        
+        if (self.interval, self.limit) != before:
+            if not congested:
+                reason = '정상' if median_ms is None else f"정상, 응답 중앙값 {median_ms:.0f}ms"
+            elif errors:
+                reason = f"서버 오류 {errors}건"
+            elif median_ms is not None and median_ms > self.target_ms:
+                reason = f"응답 중앙값 {median_ms:.0f}ms"
+            else:
+                reason = kind
+            log.debug(f"🎚️ 처리 속도 조절 ({reason}): 간격 {before[0]:g}→{self.interval:g}초, 동시 처리 {before[1]}→{self.limit}개")
+
+    def summary(self):
+        return {
+            'interval_s': self.interval,
+            'fastest_interval_s': self.fastest_interval,
+            'concurrency': self.limit,
+            'backoffs': self.backoffs
+        }
+
+class StartGate:
+    """사전 준비(로그인·인덱스·워커 페이지)를 마친 워커를 지정 시각에 한꺼번에 출발시키는 관문
+
+    시작 시각이 없으면 준비되는 즉시 열리며, 완료 시각은 시작 시각(없으면 관문이 열린 시각) 기준 초로 기록한다.
+    """
+
+    def __init__(self, start_at=None, max_wait=1800):
+        self.start_at = start_at
+        self.max_wait = max_wait
+        self.event = asyncio.Event()
+        self.released_at = None
+        self.done_offsets = []
+
+    @staticmethod
+    def parse(spec, now=None):
+        """START_AT 값을 시작 시각으로 변환 ('HH:MM[:SS]'는 12시간 이상 지났으면 다음 날 같은 시각)"""
+        spec = (spec or '').strip()
+        if not spec:
+            return None
+        now = now or datetime.now()
+        try:
+            return datetime.fromisoformat(spec)
+        except ValueError:
+            pass
+        for fmt in ('%H:%M:%S', '%H:%M'):
+            try:
+                start = datetime.combine(now.date(), datetime.strptime(spec, fmt).time())
+                break
+            except ValueError:
+                continue
+        else:
+            raise ValueError(f"START_AT 형식 오류: {spec} (HH:MM[:SS] 또는 YYYY-MM-DDTHH:MM:SS)")
+        if (now - start).total_seconds() > 12 * 3600:
+            start += timedelta(days=1)
+        return start
+
+    @property
+    def pending(self):
+        """아직 시작 시각 전인지"""
+        return self.start_at is not None and not self.event.is_set() and datetime.now() < self.start_at
+
+    async def wait_for_start(self):
+        """시작 시각까지 대기 (대부분은 한 번에 자고 마지막 1초는 짧게 나눠 오차를 줄임)"""
+        if self.start_at is None:
+            return
+        remaining = (self.start_at - datetime.now()).total_seconds()
+        if remaining > self.max_wait:
+            log.warning(f"⚠️ 시작 시각 {self.start_at:%H:%M:%S}까지 {remaining:.0f}초 - 최대 대기 {self.max_wait:g}초를 넘어 바로 시작합니다.")
+            return
+        if remaining <= 0:
+            log.warning(f"⚠️ 시작 시각 {self.start_at:%H:%M:%S}보다 {-remaining:.1f}초 늦게 준비 완료 - 바로 시작합니다.")
+            return
+        log.info(f"⏳ 준비 완료 - 시작 시각 {self.start_at:%H:%M:%S}까지 {remaining:.1f}초 대기")
+        while remaining > 0:
+            await asyncio.sleep(remaining - 1 if remaining > 1.5 else min(remaining, 0.01))
+            remaining = (self.start_at - datetime.now()).total_seconds()
+
+    def open(self):
+        self.released_at = datetime.now()
+        self.event.set()
+
+    async def wait(self):
+        await self.event.wait()
+
+    def mark_done(self):
+        """매물 처리(재광고 결제) 완료 시각 기록"""
+        origin = self.start_at or self.released_at or datetime.now()
+        self.done_offsets.append(round((datetime.now() - origin).total_seconds(), 2))
+
+    def summary(self):
+        return {
+            'start_at': self.start_at.isoformat(timespec='milliseconds') if self.start_at else None,
+            'released_at': self.released_at.isoformat(timespec='milliseconds') if self.released_at else None,
+            'first_done_s': min(self.done_offsets) if self.done_offsets else None,
+            'last_done_s': max(self.done_offsets) if self.done_offsets else None
+        }
+
+def shard_suffix(path, shard_index, shard_count):
+    """샤드 실행 시 결과 파일명에 샤드 번호 추가 (예: run_report_shard1of3.json)"""
+    if shard_count <= 1 or not path:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_shard{shard_index + 1}of{shard_count}{ext}"
+
+def merge_run_reports(paths):
+    """샤드별 실행 리포트를 하나로 병합 (단계 통계는 전체 이벤트 기준으로 재계산)"""
+    merged = RunMetrics()
+    outcome = {'total': 0, 'success_count': 0, 'failed': [], 'skipped': {}}
+    shards = []
+    started_at = []
+    elapsed = 0.0
+    for path in sorted(paths):
+        with open(path, encoding='utf-8') as f:
+            report = json.load(f)
+        shard_outcome = report.get('outcome', {})
+        shards.append({'path': path, **shard_outcome})
+        started_at.append(report['started_at'])
+        elapsed = max(elapsed, report.get('elapsed_s', 0))  # 샤드는 병렬 실행
+        outcome['total'] += shard_outcome.get('total', 0)
+        outcome['success_count'] += shard_outcome.get('success_count', 0)
+        outcome['failed'].extend(shard_outcome.get('failed', []))
+        outcome['skipped'].update(shard_outcome.get('skipped', {}))
+        if 'error' in shard_outcome:
+            outcome.setdefault('errors', []).append(shard_outcome['error'])
+        shard_start = shard_outcome.get('start') or {}
+        if shard_start.get('first_done_s') is not None:
+            # 샤드가 같은 시작 시각을 쓰므로 가장 빠른/늦은 완료로 합침
+            start = outcome.setdefault('start', dict(shard_start))
+            start['first_done_s'] = min(start['first_done_s'], shard_start['first_done_s'])
+            start['last_done_s'] = max(start['last_done_s'], shard_start['last_done_s'])
+        for name, amount in report.get('counters', {}).items():
+            merged.count(name, amount)
+        merged.events.extend(report.get('events', []))
+
+    return {
+        'started_at': min(started_at) if started_at else None,
+        'elapsed_s': elapsed,
+        'outcome': outcome,
+        'shards': shards,
+        'phases': merged.summary(),
+        'counters': merged.counters,
+        'events': merged.events
+    }
+
+class MultiPropertyAutomation:
+    def __init__(self, shard_index=0, shard_count=1):
+        setup_logging(shard_index, shard_count)
         self.login_id = os.getenv('LOGIN_ID', 'keunmun')
         self.login_pw = os.getenv('LOGIN_PASSWORD', 'tjsrb1234!')
         self.login_url = "https://www.aipartner.com/integrated/login?serviceCode=1000"
         self.ad_list_url = "https://www.aipartner.com/offerings/ad_list"
         
-        # 환경변수에서 매물번호들 가져오기
-        property_numbers_str = os.getenv('PROPERTY_NUMBERS', '')
-        self.property_numbers = [
-            num.strip() for num in property_numbers_str.split(',') 
-            if num.strip()
-        ]
+        # 대용량 입력: 파일/표준입력에서 매물번호 읽기 (PROPERTY_NUMBERS 대신 사용)
+        self.property_source = os.getenv('PROPERTY_SOURCE', '')
+        self.property_source_format = os.getenv('PROPERTY_SOURCE_FORMAT', '')
+        self.stream_buffer = int(os.getenv('STREAM_BUFFER', '100'))  # 큐에 미리 읽어 둘 최대 건수
+        self.streamed_count = 0
+        
+        if self.property_source and self.property_source != '-':
+            # 끝이 있는 파일은 미리 모두 읽어 목록 실행과 같이 처리 계획/일괄 노출종료/ETA 사용
+            requested = list(iter_property_numbers(self.property_source, self.property_source_format))
+            log.info(f"📂 {self.property_source}에서 매물번호 {len(requested)}개 읽음")
+            self.property_source = ''
+        else:
+            # 환경변수에서 매물번호들 가져오기
+            property_numbers_str = os.getenv('PROPERTY_NUMBERS', '')
+            requested = [
+                num.strip() for num in property_numbers_str.split(',') 
+                if num.strip()
+            ]
+        # 중복 매물번호 제거 (입력 순서 유지)
+        self.property_numbers = list(dict.fromkeys(requested))
+        if len(self.property_numbers) < len(requested):
+            log.info(f"🧹 중복 매물번호 {len(requested) - len(self.property_numbers)}개 제거")
+        
+        # 샤드 실행: 전체 목록 중 이 샤드의 몫만 처리 (순서 기준 라운드로빈, 모든 샤드가 같은 결과)
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        if shard_count > 1 and self.property_source:
+            log.info(f"🧩 샤드 {shard_index + 1}/{shard_count}: 입력 중 {shard_index + 1}번째부터 {shard_count}개마다 1개 담당")
+        elif shard_count > 1:
+            self.property_numbers = self.property_numbers[shard_index::shard_count]
+            log.info(f"🧩 샤드 {shard_index + 1}/{shard_count}: 매물 {len(self.property_numbers)}개 담당")
+        
+        self.test_mode = os.getenv('TEST_MODE', 'false').lower() == 'true'
+        
+        # 매물 리스트 검색 범위 및 매물번호 위치 인덱스
+        self.max_pages = 10
+        self.ad_list_index = AdListIndex()
+        
+        # 서버 검색 설정: auto(검색 URL 템플릿 또는 검색 폼) / off(페이지 검색만)
+        self.search_mode = os.getenv('SEARCH_MODE', 'auto').lower()
+        self.search_url_template = os.getenv('SEARCH_URL_TEMPLATE', '')  # 예: ...?searchKeyword={number}
+        self.search_input_selector = os.getenv(
+            'SEARCH_INPUT_SELECTOR',
+            'input[name="searchKeyword"], input[name*="search"], input[type="search"]'
+        )
+        
+        # 목록 조회 방식: auto(로그인 쿠키로 HTML을 직접 받아 파싱, 안 되면 브라우저) / browser
+        # HTTP_LIST_URL_TEMPLATE 미설정 시 '{ad_list_url}?page={page}' 사용
+        self.list_fetch_mode = os.getenv('LIST_FETCH_MODE', 'auto').lower()
+        self.http_list_url_template = os.getenv('HTTP_LIST_URL_TEMPLATE', '')
+        self.http_client = None
+        
+        # 지정 시각 동시 시작: 로그인·인덱스·워커 페이지를 미리 준비하고 START_AT(예: 00:00:00)에 출발
+        # 시각은 배치마다 다시 계산 (상주 모드는 매일 같은 시각에 맞춤), 형식 오류는 시작 시 바로 확인
+        self.start_at = os.getenv('START_AT', '').strip()
+        StartGate.parse(self.start_at)
+        self.start_max_wait = float(os.getenv('START_MAX_WAIT', '1800'))
+        self.start_gate = None
+        
+        # 일괄 노출종료: auto(목록에 선택 노출종료 버튼이 있으면 같은 페이지 매물을 한 번에 종료) / off
+        self.bulk_end_mode = os.getenv('BULK_END', 'auto').lower()
+        self.bulk_ended = set()  # 일괄 노출종료가 확인된 매물번호
+        self.bulk_groups = {}  # 출발 후 워커가 처리할 일괄 노출종료 (페이지 -> 매물번호 목록, START_AT 실행)
+        self.bulk_events = {}  # 페이지 -> 해당 페이지 일괄 노출종료 완료 이벤트
+        
+        # 실패 유형별 재시도 정책 (RETRY_POLICY='{"navigation_timeout": [3, 5]}' 형식으로 조정)
+        self.retry_policy = RetryPolicy(json.loads(os.getenv('RETRY_POLICY') or '{}'))
+        
+        # 병렬 워커 수 및 매물 처리 시작 간격(초, 전체 워커 공통)
+        self.worker_count = max(1, int(os.getenv('WORKER_COUNT', '1')))
+        self.property_interval = float(os.getenv('PROPERTY_INTERVAL', '5'))
+        
+        # 로그인 세션 캐시 (경로를 비우면 비활성화)
+        self.session_cache = SessionCache(
+            os.getenv('SESSION_CACHE_PATH', '.session/storage_state.json'),
+            float(os.getenv('SESSION_MAX_AGE', '21600')),
+            self.login_id
+        )
+        
+        # 처리 속도: adaptive(응답 지연·오류에 따라 간격과 동시 처리 수 자동 조절) / fixed(PROPERTY_INTERVAL 고정)
+        self.throttle_mode = os.getenv('THROTTLE', 'adaptive').lower()
+        self.throttle_min_interval = float(os.getenv('THROTTLE_MIN_INTERVAL', '1'))
+        self.throttle_max_interval = float(os.getenv('THROTTLE_MAX_INTERVAL', '30'))
+        self.throttle_target_ms = float(os.getenv('THROTTLE_TARGET_MS', '2000'))
+        self.throttle_step = float(os.getenv('THROTTLE_STEP', '0.5'))
+        self.response_monitor = ResponseMonitor() if self.throttle_mode == 'adaptive' else None
+        self.throttle_summary = None
+        
+        # 헤드리스 실행용 네트워크 리소스 차단 및 slow_mo(ms, 운영 환경은 0 권장)
+        self.slow_mo = int(os.getenv('SLOW_MO', '500'))
+        self.resource_blocker = None
+        if os.getenv('BLOCK_RESOURCES', 'false').lower() == 'true':
+            self.resource_blocker = ResourceBlocker(
+                env_list('BLOCK_RESOURCE_TYPES', 'image,font,media'),
+                # 팝업 배너 이미지만 차단 (결제/공지 팝업 문서·XHR·스크립트는 URL에 popup이 있어도 통과)
+                env_list('BLOCK_URL_PATTERNS', '*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*facebook.net*,image:*popup*'),
+                env_list('ALLOW_URL_PATTERNS')
+            )
+        if self.response_monitor:
+            self.response_monitor.blocker = self.resource_blocker
+        
+        # 매물 리스트 화면의 팝업 오버레이 자동 숨김
+        self.overlays = OverlaySuppressor(['/offerings/ad_list'])
+        
+        # 재시작 시 이어서 처리하기 위한 실행 저널 (테스트 모드는 기록 안 함)
+        self.journal = None
+        if not self.test_mode:
+            self.journal = RunJournal(
+                shard_suffix(os.getenv('RUN_JOURNAL_PATH', 'results/run_journal.jsonl'), shard_index, shard_count),
+                os.getenv('RUN_ID') or self.default_run_id()
+            )
+        
+        # 스크린샷 저장 정책 (off / failure / sampled / always), 형식 및 폴더 용량 상한(MB)
+        self.artifacts = ArtifactCapture(
+            shard_suffix(os.getenv('ARTIFACT_DIR', 'artifacts'), shard_index, shard_count),
+            os.getenv('CAPTURE_POLICY', 'failure').lower(),
+            float(os.getenv('CAPTURE_SAMPLE_RATE', '0.1')),
+            os.getenv('CAPTURE_FORMAT', 'jpeg').lower(),
+            int(os.getenv('CAPTURE_QUALITY', '70')),
+            float(os.getenv('ARTIFACT_BUDGET_MB', '50'))
+        )
+        
+        # 단계별 소요 시간 리포트 및 Playwright 트레이스(선택)
+        self.metrics = RunMetrics()
+        self.progress = ProgressFeed()  # 진행 현황 (PROGRESS_PATH JSONL, 상주 모드 status)
+        self.base_report_path = shard_suffix(os.getenv('RUN_REPORT_PATH', 'results/run_report.json'), shard_index, shard_count)
+        self.report_path = shard_suffix(os.getenv(
+            'RUN_REPORT_PATH',
+            f"results/run_report_{self.metrics.started_at.strftime('%Y%m%d_%H%M%S')}.json"
+        ), shard_index, shard_count)
+        self.trace_path = shard_suffix(os.getenv('TRACE_PATH', ''), shard_index, shard_count)
+        
+        # 사이트 셀렉터 (SELECTOR_OVERRIDES='{"end_button": ["#naverEnd", ".btnEnd"]}' 형식으로 교체)
+        self.selectors = SiteSelectors(json.loads(os.getenv('SELECTOR_OVERRIDES') or '{}'))
+        parser_overrides = sorted(self.selectors.overridden.intersection(AdListParser.SELECTORS))
+        if self.list_fetch_mode == 'auto' and parser_overrides:
+            # HTML 파서는 기본 셀렉터 구조만 알고 있어 교체된 셀렉터로는 노출 여부를 잘못 읽음
+            log.info(f"ℹ️ 셀렉터 교체({', '.join(parser_overrides)})로 HTTP 목록 조회 대신 브라우저 사용")
+            self.list_fetch_mode = 'browser'
+        
+        # 신호 기반 대기
+        self.waits = PageWaiter(self.selectors)
+        self.dialogs = {}  # 페이지 -> DialogDispatcher
+        self.nav = {}  # 페이지 -> NavigationState
+        
+        self.context_options = {
+            'viewport': {'width': 1280, 'height': 720},
+            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        }
+        
+        log.info(f"🔧 로그인 ID: {self.login_id}")
+        if self.property_source:
+            log.info(f"🏠 처리할 매물: {'표준입력' if self.property_source == '-' else self.property_source}에서 읽으며 처리")
+        else:
+            log.info(f"🏠 처리할 매물: {len(self.property_numbers)}개")
+            log.info(f"📋 매물번호: {', '.join(self.property_numbers)}")
+        log.info(f"🧪 테스트 모드: {self.test_mode}")
+        log.info(f"👷 워커 수: {self.worker_count}")
+        log.info(f"🚫 리소스 차단: {self.resource_blocker is not None} (slow_mo={self.slow_mo}ms)")
+    
+    @staticmethod
+    def default_run_id():
+        """RUN_ID가 없을 때의 실행 ID - 이번 실행에만 해당 (재개하려면 이전 실행의 RUN_ID를 지정)
+        
+        날짜를 쓰면 같은 날 이후 실행(예: 낮 수동 재광고 뒤의 자정 실행)이 결제 완료 매물을 건너뛰게 된다.
+        """
+        if os.getenv('GITHUB_RUN_ID'):
+            return f"gh_{os.getenv('GITHUB_RUN_ID')}_{os.getenv('GITHUB_RUN_ATTEMPT', '1')}"
+        return f"run_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    
+    async def login(self, page):
+        """로그인 처리"""
+        with self.metrics.phase('login'):
+            return await self._login(page)
+    
+    async def _login(self, page):
+        log.debug("🔗 로그인 페이지로 이동 중...")
+        
+        await page.goto(self.login_url, timeout=60000)
+        await page.wait_for_selector(self.selectors.css('login_id'), timeout=30000)
+        
+        await page.fill(self.selectors.css('login_id'), self.login_id)
+        await page.fill(self.selectors.css('login_pw'), self.login_pw)
+        await page.click(self.selectors.css('login_submit'))
+        
+        # 로그인 페이지를 벗어날 때까지 대기 (최대 10초)
+        await self.waits.url(page, lambda url: 'login' not in url.lower(), timeout=10000)
+        await self.waits.network_idle(page, timeout=5000)
+        
+        # 로그인 성공 확인
+        current_url = page.url
+        title = await page.title()
+        
+        log.debug(f"🔗 로그인 후 URL: {current_url}")
+        log.debug(f"📄 로그인 후 제목: {title}")
+        
+        is_login_page = any([
+            'login' in current_url.lower(),
+            '로그인' in title,
+            await page.query_selector(self.selectors.css('login_id'))
+        ])
+        
+        if is_login_page:
+            log.error("❌ 로그인 실패")
+            return False
+        
+        log.info("✅ 로그인 완료")
+        return True
+    
+    async def validate_session(self, page):
+        """저장된 세션으로 매물 리스트에 바로 접근되는지 확인"""
+        try:
+            await page.goto(self.ad_list_url, timeout=60000)
+        except Exception as e:
+            log.warning(f"⚠️ 세션 확인 중 오류: {e}")
+            return False
+        
+        if 'login' in page.url.lower() or await page.query_selector(self.selectors.css('login_id')):
+            return False
+        self.nav[page].set(page, 'active')
+        return True
+    
+    async def ensure_login(self, context, page, session_restored):
+        """저장된 세션 재사용, 유효하지 않으면 로그인 후 세션 저장"""
+        if session_restored:
+            if await self.validate_session(page):
+                log.info("✅ 저장된 로그인 세션 재사용")
+                return True
+            log.warning("⚠️ 저장된 세션이 유효하지 않아 다시 로그인합니다.")
+            self.session_cache.clear()
+            await context.clear_cookies()
+        
+        if not await self.login(page):
+            return False
+        
+        self.session_cache.save(await context.storage_state())
+        return True
+    
+    async def handle_popup_overlay(self, page):
+        """팝업 오버레이 숨김 (이미 자동 숨김된 경우 확인만 수행)"""
+        hidden_count = await self.overlays.sweep(page)
+        if hidden_count:
+            self.metrics.count('overlay_hidden', hidden_count)
+            log.debug(f"🧹 팝업 오버레이 {hidden_count}개 숨김 처리됨")
+    
+    async def read_page_rows(self, page, timeout=30000):
+        """현재 페이지 매물 행 스냅샷 (page.evaluate 1회로 전체 테이블 추출)"""
+        await page.wait_for_selector(self.selectors.css('list_rows'), timeout=timeout)
+        with self.metrics.phase('row_scan'):
+            records = await page.evaluate(ROW_SNAPSHOT_JS, self.selectors.row_snapshot_args())
+        
+        # 매물번호 셀이 있는 행만 사용
+        return [record for record in records if record['number']]
+    
+    def row_locator(self, page, record):
+        """스냅샷 행과 같은 매물번호를 가진 테이블 행 Locator
+
+        행 순서가 아닌 매물번호로 찾으므로 스냅샷 이후 테이블이 다시 그려져도 다른 매물을 누르지 않는다.
+        """
+        # 셀 전체가 매물번호와 같아야 함 (부분일치면 123이 1234 행에도 걸림, 줄바꿈 등 공백은 정규화됨)
+        pattern = r'\s+'.join(re.escape(part) for part in record['number'].split())
+        number = page.locator(self.selectors.css('row_number'), has_text=re.compile(rf"^\s*{pattern}\s*$"))
+        return page.locator(self.selectors.css('list_rows')).filter(has=number)
+    
+    async def find_row_on_page(self, page, property_number, current_page):
+        """현재 페이지에서 매물 행 검색 (읽은 행으로 인덱스 갱신)"""
+        log.debug(f"📄 {current_page}페이지에서 매물 검색 중...")
+        records = await self.read_page_rows(page)
+        log.debug(f"📊 {current_page}페이지 매물 수: {len(records)}개")
+        
+        self.ad_list_index.update_page(current_page, [(record['row'], record['number'], record['has_end_button']) for record in records])
+        
+        for record in records:
+            if property_number in record['number']:
+                log.info(f"🎯 매물번호 {property_number} 발견! ({current_page}페이지, 행 {record['row']})")
+                return record
+        return None
+    
+    async def search_property(self, page, property_number):
+        """매물번호 검색(쿼리 파라미터 또는 검색 폼) 결과에서 매물 행 반환, 없으면 None
+        
+        검색 수단이 없거나 검색이 한 번이라도 빗나가면(결과 없음/오류) 이번 실행 동안 검색을 끄고
+        인덱스/페이지 검색으로만 진행한다. 엉뚱한 입력창이 잡힌 경우 매물마다 헛검색하지 않기 위함.
+        """
+        started = time.perf_counter()
+        try:
+            if self.search_url_template:
+                log.debug(f"🔎 검색 URL로 매물번호 {property_number} 조회 중...")
+                await page.goto(self.search_url_template.format(number=property_number), timeout=60000)
+                await self.waits.network_idle(page, timeout=3000)
+            else:
+                search_input = await page.query_selector(self.search_input_selector)
+                if not search_input:
+                    log.debug("ℹ️ 매물 검색 입력창이 없어 페이지 검색으로 진행합니다.")
+                    self.search_mode = 'off'
+                    return None
+                
+                log.debug(f"🔎 검색 폼으로 매물번호 {property_number} 조회 중...")
+                before = await self.waits.table_signature(page)
+                await search_input.fill(property_number)
+                await search_input.press('Enter')
+                await self.waits.table_change(page, before, timeout=5000)
+                await self.waits.network_idle(page, timeout=3000)
+            
+            self.nav[page].set(page, 'search')
+            await self.handle_popup_overlay(page)
+            # 검색 결과는 실제 페이지 구성과 다르므로 인덱스는 갱신하지 않음
+            for record in await self.read_page_rows(page, timeout=5000):
+                if property_number in record['number']:
+                    log.info(f"🎯 검색으로 매물번호 {property_number} 발견! (행 {record['row']})")
+                    self.metrics.record('search', started)
+                    return record
+            
+            log.warning(f"⚠️ 검색 결과에 매물번호 {property_number}가 없어 이번 실행 동안 검색을 끄고 페이지 검색으로 전환")
+        except Exception as e:
+            log.warning(f"⚠️ 매물 검색 중 오류 (이번 실행 동안 검색을 끄고 페이지 검색으로 전환): {e}")
+        
+        self.search_mode = 'off'
+        self.metrics.record('search', started, 'miss')
+        return None
+    
+    async def click_pagination(self, page, button, target_page):
+        """페이지네이션 버튼 클릭 후 로딩 대기"""
+        dialogs = self.dialogs[page]
+        handled_before = dialogs.handled_count
+
+        log.debug(f"📄 {target_page}페이지로 이동 중...")
+        started = time.perf_counter()
+        before = await self.waits.table_signature(page)
+        await button.click()
+
+        # 테이블 내용이 바뀌고 네트워크가 잦아들 때까지 대기 (최대 5초)
+        await self.waits.table_change(page, before, timeout=5000)
+        await self.waits.network_idle(page, timeout=5000)
+
+        # 팝업 오버레이 처리
+        await self.handle_popup_overlay(page)
+
+        if dialogs.handled_count > handled_before:
+            self.metrics.count('dialog_pagination')
+            log.debug("✅ 페이지네이션 팝업 처리됨")
+
+        # 새 페이지 로딩 대기
+        try:
+            await page.wait_for_selector(self.selectors.css('list_rows'), timeout=15000)
+            nav = self.nav[page]
+            nav.set(page, nav.view or 'active', target_page)
+            self.metrics.record('pagination', started, page=target_page)
+            log.debug(f"✅ {target_page}페이지 로딩 완료")
+        except:
+            self.metrics.record('pagination', started, 'error', page=target_page)
+            log.warning(f"⚠️ {target_page}페이지 로딩 실패 - 계속 진행")
+    
+    async def is_last_list_page(self, page):
+        """다음 페이지 버튼이 비활성화된 마지막 페이지인지 확인"""
+        next_button = await page.query_selector(self.selectors.css('next_page'))
+        if not next_button:
+            return False
+        button_class = await next_button.get_attribute('class')
+        return bool(button_class and 'disabled' in button_class)
+    
+    async def go_to_next_page(self, page, current_page, error_tag):
+        """다음 페이지로 이동 (더 이상 이동할 수 없으면 False)"""
+        try:
+            next_button = await page.query_selector(self.selectors.css('next_page'))
+            if not next_button:
+                # 다음 버튼이 없으면 페이지 번호 링크로 우회
+                next_link = await self.find_page_link(page, current_page + 1)
+                if next_link:
+                    await self.click_pagination(page, next_link, current_page + 1)
+                    return True
+                log.debug("다음 페이지 버튼을 찾을 수 없습니다.")
+                return False
+            
+            button_class = await next_button.get_attribute('class')
+            if button_class and 'disabled' in button_class:
+                log.debug("마지막 페이지에 도달했습니다.")
+                return False
+            
+            await self.click_pagination(page, next_button, current_page + 1)
+            return True
+        except Exception as e:
+            log.warning(f"페이지 이동 중 오류: {e}")
+            self.note_failure('pagination_error')
+            # 오류 시 매물 목록 영역만 캡처
+            path = await self.artifacts.capture(
+                page, f"pagination_error_{error_tag}_{current_page}", failure=True,
+                locator=page.locator(self.selectors.css('list_section')).first
+            )
+            if path:
+                log.info(f"페이지네이션 오류 스크린샷 저장: {path}")
+            return False
+    
+    async def find_page_link(self, page, target_page):
+        """페이지네이션에서 번호가 target_page인 링크 (없으면 None)"""
+        if 'page_links' in self.selectors.unavailable:
+            return None
+        for link in await page.query_selector_all(self.selectors.css('page_links')):
+            if (await link.inner_text()).strip() == str(target_page):
+                return link
+        return None
+    
+    async def goto_list_page(self, page, target_page, error_tag):
+        """1페이지에서 목표 페이지로 바로 이동 (도착한 페이지 번호 반환)"""
+        # 페이지 번호 링크가 있으면 한 번에 이동
+        try:
+            link = await self.find_page_link(page, target_page)
+            if link:
+                await self.click_pagination(page, link, target_page)
+                return target_page
+        except Exception as e:
+            log.warning(f"⚠️ 페이지 번호 링크 이동 실패: {e}")
+        
+        # 번호 링크가 없으면 행 검색 없이 다음 버튼으로 이동
+        current_page = 1
+        while current_page < target_page:
+            if not await self.go_to_next_page(page, current_page, error_tag):
+                break
+            current_page += 1
+        return current_page
+    
+    async def start_http_client(self, context):
+        """로그인된 컨텍스트의 쿠키로 HTTP 목록 조회 클라이언트 준비 (LIST_FETCH_MODE=auto)"""
+        if self.list_fetch_mode != 'auto':
+            return
+        if self.http_client:
+            self.http_client.close()
+        storage_state = await context.storage_state()
+        self.http_client = AdListHttpClient(
+            self.http_list_url_template or self.ad_list_url + '?page={page}',
+            storage_state['cookies'],
+            self.context_options['user_agent']
+        )
+    
+    def stop_http_client(self, reason=None):
+        if reason:
+            log.warning(f"⚠️ HTTP 목록 조회 중단 - 브라우저로 진행: {reason}")
+        if self.http_client:
+            self.http_client.close()
+            self.http_client = None
+    
+    def reset_batch_state(self):
+        """배치 중 꺼진 검색/일괄 노출종료와 일괄 종료 기록을 설정값으로 되돌림 (상주 모드 배치 시작 시)"""
+        self.search_mode = os.getenv('SEARCH_MODE', 'auto').lower()
+        self.bulk_end_mode = os.getenv('BULK_END', 'auto').lower()
+        self.bulk_ended = set()
+        self.bulk_groups = {}
+        self.bulk_events = {}
+    
+    async def fetch_list_page_http(self, page_no):
+        """HTTP로 목록 page_no페이지 조회 (행 목록, 마지막 페이지 여부) - 블로킹 요청은 스레드에서 실행"""
+        started = time.perf_counter()
+        try:
+            with self.metrics.phase('http_list', page=page_no):
+                result = await asyncio.to_thread(self.http_client.fetch_page, page_no)
+        except Exception:
+            if self.response_monitor:
+                self.response_monitor.observe(error=True)
+            raise
+        if self.response_monitor:
+            self.response_monitor.observe((time.perf_counter() - started) * 1000)
+        return result
+    
+    async def build_ad_list_index_http(self):
+        """브라우저 렌더링 없이 HTTP로 인덱스 생성 (결과를 믿기 어려우면 False)"""
+        first_numbers = set()
+        try:
+            for page_no in range(1, self.max_pages + 1):
+                rows, is_last = await self.fetch_list_page_http(page_no)
+                if not rows:
+                    if page_no == 1:
+                        self.stop_http_client("HTML에서 매물 행을 찾을 수 없음")
+                        return False
+                    break
+                if rows[0]['number'] in first_numbers:
+                    # 페이지 파라미터가 무시되고 같은 페이지가 반복됨
+                    self.stop_http_client("HTTP_LIST_URL_TEMPLATE의 페이지 이동이 동작하지 않음")
+                    return False
+                first_numbers.add(rows[0]['number'])
+                
+                self.ad_list_index.update_page(page_no, [(row['row'], row['number'], row['has_end_button']) for row in rows])
+                log.debug(f"📊 {page_no}페이지: {len(rows)}개 인덱싱 (HTTP)")
+                if is_last:
+                    self.ad_list_index.complete = True
+                    break
+        except Exception as e:
+            self.stop_http_client(e)
+            return False
         
-        self.test_mode = os.getenv('TEST_MODE', 'false').lower() == 'true'
+        log.info(f"✅ 인덱스 생성 완료: {len(self.ad_list_index)}개 매물 (HTTP {self.http_client.request_count}건)")
+        return True
+    
+    async def http_locate(self, property_number):
+        """HTTP로 목록을 다시 읽어 매물 위치 확인 ((페이지, 행) 또는 None, 목록 전체 확인 여부)"""
+        try:
+            for page_no in range(1, self.max_pages + 1):
+                rows, is_last = await self.fetch_list_page_http(page_no)
+                self.ad_list_index.update_page(page_no, [(row['row'], row['number'], row['has_end_button']) for row in rows])
+                for row in rows:
+                    if property_number in row['number']:
+                        return (page_no, row['row']), False
+                if is_last:
+                    return None, True
+                if not rows:
+                    break
+        except Exception as e:
+            self.stop_http_client(e)
+        return None, False
+    
+    async def check_site_layout(self, page):
+        """매물 목록 화면의 셀렉터 점검 (필수 셀렉터가 없으면 SiteLayoutError로 즉시 중단)"""
+        with self.metrics.phase('health_check'):
+            found = await self.selectors.health_check(
+                page, SiteSelectors.LIST_CRITICAL + SiteSelectors.LIST_OPTIONAL + ['end_button']
+            )
+        
+        missing = [name for name in SiteSelectors.LIST_CRITICAL if not found[name]]
+        if missing:
+            raise SiteLayoutError(f"매물 목록 화면에서 필수 셀렉터를 찾을 수 없습니다: {', '.join(missing)}")
         
-        print(f"🔧 로그인 ID: {self.login_id}")
-        print(f"🏠 처리할 매물: {len(self.property_numbers)}개")
-        print(f"📋 매물번호: {', '.join(self.property_numbers)}")
-        print(f"🧪 테스트 모드: {self.test_mode}")
+        for name, alternative in found.items():
+            if alternative:
+                self.selectors.hit(name)
+        for name in SiteSelectors.LIST_OPTIONAL:
+            if not found[name]:
+                self.selectors.unavailable.add(name)
+                log.warning(f"⚠️ 선택 셀렉터 없음: {name} - 대체 방법으로 진행")
+        if found['list_rows'] and not found['end_button']:
+            # 1페이지가 모두 노출종료 상태일 수 있으므로 중단하지 않음 (셀렉터 변경이면 매물 처리 중 고장 판정)
+            log.info("ℹ️ 1페이지에 노출종료 버튼 없음 - 노출 중인 매물이 없거나 end_button 셀렉터 변경")
+        fallbacks = [f"{name}={alt}" for name, alt in found.items() if alt and alt != self.selectors.alternatives[name][0]]
+        if fallbacks:
+            log.debug(f"🔀 대체 셀렉터 사용: {', '.join(fallbacks)}")
+        log.info("✅ 사이트 셀렉터 점검 통과")
     
-    async def login(self, page):
-        """로그인 처리"""
-        print("🔗 로그인 페이지로 이동 중...")
+    async def build_ad_list_index(self, page):
+        """매물 리스트를 한 번만 순회하여 매물번호 인덱스 생성"""
+        log.info("\n🗂️ 매물 리스트 인덱스 생성 중...")
+        current_page = 1
         
-        await page.goto(self.login_url, timeout=60000)
-        await page.wait_for_selector('#member-id', timeout=30000)
+        try:
+            if self.nav[page].is_on(page, 'active', 1):
+                # 세션 확인에서 이미 목록 1페이지를 열었으면 다시 이동하지 않음
+                log.debug("♻️ 이미 열린 매물 리스트 1페이지 재사용")
+            else:
+                with self.metrics.phase('list_load'):
+                    await page.goto(self.ad_list_url, timeout=60000)
+                    await self.waits.network_idle(page, timeout=3000)
+                    await self.handle_popup_overlay(page)
+                self.nav[page].set(page, 'active')
+            
+            # HTTP 인덱스를 쓰더라도 매물 처리는 브라우저로 하므로 셀렉터 점검은 항상 수행
+            await self.check_site_layout(page)
+            
+            if self.http_client:
+                self.ad_list_index = AdListIndex()
+                if await self.build_ad_list_index_http():
+                    if len(self.ad_list_index) and not self.ad_list_index.exposed_count():
+                        # HTML 파싱 규칙이 노출종료 버튼을 못 찾는 것일 수 있으므로 브라우저로 다시 확인
+                        self.stop_http_client("노출종료 버튼이 있는 매물 행을 찾을 수 없음")
+                    else:
+                        return
+                self.ad_list_index = AdListIndex()
+            
+            while current_page <= self.max_pages:
+                records = await self.read_page_rows(page)
+                self.ad_list_index.update_page(current_page, [(record['row'], record['number'], record['has_end_button']) for record in records])
+                log.debug(f"📊 {current_page}페이지: {len(records)}개 인덱싱")
+                
+                if await self.is_last_list_page(page):
+                    self.ad_list_index.complete = True
+                    break
+                if current_page >= self.max_pages:
+                    break
+                if not await self.go_to_next_page(page, current_page, 'index'):
+                    break
+                current_page += 1
+            
+            if len(self.ad_list_index) and not self.ad_list_index.exposed_count():
+                # 광고중 목록의 모든 행에 노출종료 버튼이 없으면 셀렉터 변경으로 판단 (전 매물 제외 방지)
+                raise SiteLayoutError(f"광고중 목록 {len(self.ad_list_index)}개 행 모두에서 노출종료 버튼을 찾을 수 없습니다: end_button")
+            log.info(f"✅ 인덱스 생성 완료: {len(self.ad_list_index)}개 매물 ({current_page}페이지)")
+        except SiteLayoutError:
+            raise
+        except Exception as e:
+            log.warning(f"⚠️ 인덱스 생성 중 오류 (페이지 순회 검색으로 진행): {e}")
+    
+    def skip_reason(self, property_number):
+        """처리할 필요가 없는 매물이면 제외 사유, 처리 대상이면 None"""
+        if self.journal and self.journal.is_complete(property_number):
+            return SKIP_COMPLETED
+        if self.journal and self.journal.last_completed(property_number):
+            return None
+        if self.ad_list_index.lookup(property_number):
+            if not self.ad_list_index.is_exposed(property_number):
+                return '노출종료 버튼 없음 (이미 노출 종료 상태)'
+        elif self.ad_list_index.complete:
+            return '광고중 목록에 없음'
+        return None
+    
+    async def stream_properties(self, skipped):
+        """입력 파일/표준입력에서 읽은 매물번호 중 이 샤드가 처리할 것만 순서대로 내보냄"""
+        iterator = iter_property_numbers(self.property_source, self.property_source_format)
+        seen = set()
+        while True:
+            # 파일/표준입력 읽기는 이벤트 루프를 막지 않도록 스레드에서 수행
+            property_number = await asyncio.to_thread(next, iterator, None)
+            if property_number is None:
+                break
+            if property_number in seen:
+                continue
+            seen.add(property_number)
+            if (len(seen) - 1) % self.shard_count != self.shard_index:
+                continue
+            
+            self.streamed_count += 1
+            reason = self.skip_reason(property_number)
+            if reason:
+                skipped[property_number] = reason
+                log.info(f"   ⏭️ {property_number}: {reason}")
+                continue
+            yield property_number
+    
+    def plan_properties(self):
+        """인덱스의 현재 상태로 처리 계획 수립 (처리 순서 목록, 건너뛴 매물 -> 사유)
         
-        await page.fill('#member-id', self.login_id)
-        await page.fill('#member-pw', self.login_pw)
-        await page.click('#integrated-login > a')
+        결제까지 끝난 매물(성공)과 노출 중이 아닌 매물(실패로 집계)은 제외하고, 중단된 매물을 먼저,
+        나머지는 목록 페이지 순서대로 정렬해 페이지 이동을 줄인다.
+        """
+        resumed = []
+        located = []
+        unknown = []
+        skipped = {}
         
-        await page.wait_for_timeout(10000)
+        for property_number in self.property_numbers:
+            reason = self.skip_reason(property_number)
+            if reason:
+                skipped[property_number] = reason
+            elif self.journal and self.journal.last_completed(property_number):
+                resumed.append(property_number)
+            elif self.ad_list_index.lookup(property_number):
+                located.append((self.ad_list_index.lookup(property_number), property_number))
+            else:
+                # 인덱스가 목록 일부만 담고 있으면 검색으로 확인
+                unknown.append(property_number)
         
-        # 로그인 성공 확인
-        current_url = page.url
-        title = await page.title()
+        planned = resumed + [number for _, number in sorted(located)] + unknown
         
-        print(f"🔗 로그인 후 URL: {current_url}")
-        print(f"📄 로그인 후 제목: {title}")
+        log.info(f"\n🗺️ 처리 계획: {len(planned)}개 처리, {len(skipped)}개 제외")
+        for property_number, reason in skipped.items():
+            log.info(f"   ⏭️ {property_number}: {reason}")
+        return planned, skipped
+    
+    async def open_ad_list(self, page):
+        """광고중 매물 리스트 1페이지 열기 (이미 열려 있으면 재사용)"""
+        dialogs = self.dialogs[page]
+        nav = self.nav[page]
+        if nav.is_on(page, 'active', 1):
+            log.debug("♻️ 이미 열린 매물 리스트 1페이지 재사용")
+            self.metrics.count('list_reuse')
+            return
         
-        is_login_page = any([
-            'login' in current_url.lower(),
-            '로그인' in title,
-            await page.query_selector('#member-id')
-        ])
+        log.debug("🌐 매물 리스트 페이지로 이동 중...")
+        started = time.perf_counter()
+        handled_before = dialogs.handled_count
+        await page.goto(self.ad_list_url, timeout=60000)
         
-        if is_login_page:
-            print("❌ 로그인 실패")
-            return False
+        # 로그인 페이지로 돌아갔으면 세션 만료
+        if 'login' in page.url.lower():
+            self.note_failure('login_lost')
+            raise RuntimeError("로그인 세션이 만료되었습니다.")
         
-        print("✅ 로그인 완료")
-        return True
+        # 페이지 로드 후 팝업 처리 대기 (네트워크 유휴, 최대 3초)
+        await self.waits.network_idle(page, timeout=3000)
+        
+        # 팝업 오버레이 처리
+        await self.handle_popup_overlay(page)
+        
+        if dialogs.handled_count > handled_before:
+            log.debug("✅ 페이지 로드 팝업 처리됨")
+        
+        log.debug("📋 매물 테이블 로딩 대기 중...")
+        await self.selectors.wait(page, 'list_rows', timeout=30000)
+        nav.set(page, 'active')
+        self.metrics.record('list_load', started)
     
-    async def process_single_property(self, page, property_number, index, total, retry=False):
-        """단일 매물 처리 (페이지네이션 포함)"""
-        retry_text = " (재시도)" if retry else ""
-        print(f"\n{'='*60}")
-        print(f"[{index}/{total}] 매물번호 {property_number} 처리 시작{retry_text}")
-        print(f"{'='*60}")
+    async def bulk_end_exposure(self, page, planned):
+        """같은 목록 페이지의 대상 매물을 체크박스로 선택해 한 번에 노출종료 (종료가 확인된 매물번호 집합)
         
-        # 재시도인 경우 추가 대기
-        if retry:
-            print("🔄 재시도 모드: 안정성을 위해 추가 대기...")
-            await page.wait_for_timeout(3000)
+        뒤 페이지부터 처리해 앞 페이지 매물의 인덱스 위치가 밀리지 않게 한다.
+        """
+        groups = self.bulk_end_groups(planned)
+        if not groups:
+            return set()
         
-        # 페이지 로드 시 팝업 처리를 위한 전역 핸들러
-        page_load_popup_handled = False
-        async def handle_page_load_popup(dialog):
-            nonlocal page_load_popup_handled
-            print(f"🚨 페이지 로드 중 팝업 감지!")
-            print(f"   타입: {dialog.type}")
-            print(f"   메시지: '{dialog.message}'")
-
-            try:
-                await dialog.accept()
-                page_load_popup_handled = True
-                print("✅ 페이지 로드 팝업 확인 완료")
-            except Exception as e:
-                print(f"❌ 페이지 로드 팝업 처리 중 오류: {e}")
-                try:
-                    await dialog.dismiss()
-                    print("🔄 페이지 로드 팝업 취소로 처리")
-                except:
-                    print("❌ 페이지 로드 팝업 처리 실패")
-
-        # 페이지 로드 팝업 리스너 등록
-        page.on('dialog', handle_page_load_popup)
+        current_phase.set('bulk_end')
+        log.info(f"\n📦 일괄 노출종료: {len(groups)}개 페이지, {sum(len(numbers) for numbers in groups.values())}개 매물")
+        ended = set()
+        for page_no in sorted(groups, reverse=True):
+            ended |= await self.bulk_end_page(page, page_no, groups[page_no])
+            if self.bulk_end_mode == 'off':
+                break  # 일괄 노출종료를 쓸 수 없는 화면
+        log.info(f"📦 일괄 노출종료 기록: {len(ended)}개 (나머지는 개별 처리)")
+        return ended
+    
+    def bulk_end_groups(self, planned):
+        """일괄 노출종료할 목록 페이지별 대상 매물 (페이지 -> 매물번호 목록, 두 건 이상인 페이지만)"""
+        groups = {}
+        for property_number in planned:
+            if self.journal and self.journal.last_completed(property_number):
+                continue
+            location = self.ad_list_index.lookup(property_number)
+            if location and self.ad_list_index.is_exposed(property_number):
+                groups.setdefault(location[0], []).append(property_number)
+        # 한 페이지에 한 건뿐이면 개별 처리와 비용이 같음
+        return {page_no: numbers for page_no, numbers in groups.items() if len(numbers) > 1}
+    
+    async def bulk_end_group(self, page, property_number):
+        """출발 후 워커가 매물의 페이지 묶음을 처음 만나면 일괄 노출종료 (다른 워커는 끝날 때까지 대기)
         
-        # 이미지 팝업 오버레이 처리 함수
-        async def handle_popup_overlay():
-            """DOM 기반 팝업 오버레이 처리"""
-            try:
-                # 팝업 이미지를 찾고 닫기 버튼 찾기
-                popup_selectors = [
-                    'img[src*="popup"]',
-                    'div[class*="popup"]',
-                    'div[id*="popup"]',
-                    '.modal',
-                    '.overlay'
-                ]
-                
-                for selector in popup_selectors:
-                    popup_elements = await page.query_selector_all(selector)
-                    if popup_elements:
-                        print(f"🚨 {selector} 팝업 오버레이 감지 ({len(popup_elements)}개)")
-                        
-                        # 닫기 버튼 찾기 시도
-                        close_selectors = [
-                            'button[class*="close"]',
-                            'button[class*="dismiss"]',
-                            'span[class*="close"]',
-                            'div[class*="close"]',
-                            'a[class*="close"]',
-                            '.close',
-                            '.dismiss',
-                            '.x-button'
-                        ]
-                        
-                        popup_closed = False
-                        for close_selector in close_selectors:
-                            try:
-                                close_button = await page.query_selector(close_selector)
-                                if close_button:
-                                    await close_button.click()
-                                    print(f"✅ {close_selector} 닫기 버튼 클릭 성공")
-                                    popup_closed = True
-                                    break
-                            except Exception as e:
-                                continue
-                        
-                        # 닫기 버튼을 찾지 못한 경우 ESC 키 시도
-                        if not popup_closed:
-                            try:
-                                await page.keyboard.press('Escape')
-                                print("✅ ESC 키로 팝업 닫기 시도")
-                                popup_closed = True
-                            except:
-                                pass
-                        
-                        # 팝업 오버레이를 직접 숨기기 시도
-                        if not popup_closed:
-                            try:
-                                await page.evaluate('''
-                                    () => {
-                                        // 모든 팝업 오버레이 숨기기
-                                        const popups = document.querySelectorAll('img[src*="popup"], div[class*="popup"], div[id*="popup"], .modal, .overlay');
-                                        popups.forEach(popup => {
-                                            popup.style.display = 'none';
-                                            popup.style.visibility = 'hidden';
-                                            popup.remove();
-                                        });
-                                        
-                                        // z-index가 높은 요소들도 제거
-                                        const highZIndexElements = document.querySelectorAll('*');
-                                        highZIndexElements.forEach(el => {
-                                            const zIndex = window.getComputedStyle(el).zIndex;
-                                            if (zIndex && parseInt(zIndex) > 1000) {
-                                                el.style.display = 'none';
-                                                el.remove();
-                                            }
-                                        });
-                                    }
-                                ''')
-                                print("✅ JavaScript로 팝업 오버레이 제거 완료")
-                            except Exception as e:
-                                print(f"⚠️ JavaScript 팝업 제거 실패: {e}")
-                        
-                        await page.wait_for_timeout(1000)
-                        break
-                        
-            except Exception as e:
-                print(f"⚠️ 팝업 오버레이 처리 중 오류: {e}")
+        관문을 붙잡지 않도록 START_AT 실행에서만 쓰며, 앞 페이지 종료로 행이 밀려 못 찾은 매물은 매물별로 처리된다.
+        """
+        page_no = next((page_no for page_no, numbers in self.bulk_groups.items() if property_number in numbers), None)
+        if page_no is None:
+            return
+        event = self.bulk_events.get(page_no)
+        if event:
+            await event.wait()
+            return
+        event = self.bulk_events[page_no] = asyncio.Event()
+        try:
+            if self.bulk_end_mode == 'auto':
+                current_phase.set('bulk_end')
+                self.bulk_ended |= await self.bulk_end_page(page, page_no, self.bulk_groups[page_no])
+        finally:
+            event.set()
+    
+    async def bulk_end_page(self, page, page_no, property_numbers):
+        """목록 page_no페이지에서 선택 노출종료 1회 실행 (노출종료로 기록한 매물번호 집합)
         
+        클릭 직후 광고중 목록을 다시 읽어 사라진 매물을 종료로 기록한다. 클릭 이후 상태를 확인하지 못한
+        매물도 종료로 기록해 매물별 노출종료로 넘기지 않는다 (이미 종료된 매물은 광고중 목록에서 찾지 못해
+        재광고가 누락되므로). 일괄 처리를 쓸 수 없는 화면이면 bulk_end_mode를 off로 바꾼다.
+        """
+        started = time.perf_counter()
+        clicked = []
         try:
-            print("🌐 매물 리스트 페이지로 이동 중...")
-            await page.goto(self.ad_list_url, timeout=60000)
+            await self.open_ad_list(page)
+            if page_no > 1 and await self.goto_list_page(page, page_no, 'bulk') != page_no:
+                raise RuntimeError(f"{page_no}페이지로 이동하지 못함")
+            
+            bulk_button = await page.query_selector(self.selectors.css('bulk_end_button'))
+            if not bulk_button:
+                log.info("ℹ️ 선택 노출종료 버튼이 없어 매물별로 노출종료합니다.")
+                self.bulk_end_mode = 'off'
+                return set()
             
-            # 페이지 로드 후 팝업 처리 대기
-            await page.wait_for_timeout(3000)
+            targets = [
+                record for record in await self.read_page_rows(page)
+                if record['has_end_button'] and any(number in record['number'] for number in property_numbers)
+            ]
+            for record in targets:
+                # 체크박스가 없으면 30초 기본 대기 대신 짧게 실패
+                await self.row_locator(page, record).locator(self.selectors.css('row_checkbox')).check(timeout=3000)
+            if not targets:
+                return set()
             
-            # 팝업 오버레이 처리
-            await handle_popup_overlay()
+            log.info(f"🖱️ {page_no}페이지 {len(targets)}개 매물 선택 노출종료...")
+            clicked = [number for number in property_numbers if any(number in record['number'] for record in targets)]
+            dialog = await self.dialogs[page].click_expect(bulk_button, timeout=5000)
+            self.metrics.count('dialog_end_fired' if dialog else 'dialog_end_missing')
+            await self.waits.network_idle(page, timeout=3000)
+            self.nav[page].invalidate()  # 광고중 목록 내용이 바뀜
+            
+            # 광고중 목록에 노출종료 버튼과 함께 남아 있는 매물만 종료되지 않은 것으로 판단
+            remaining = await self.read_page_rows(page, timeout=10000)
+            ended = [
+                number for number in clicked
+                if not any(number in record['number'] and record['has_end_button'] for record in remaining)
+            ]
+            self.record_bulk_ended(ended)
+            if len(ended) < len(clicked):
+                log.warning(f"⚠️ 일괄 노출종료 후에도 노출 중: {', '.join(number for number in clicked if number not in ended)} (매물별 처리)")
+            self.metrics.record('bulk_end', started, page=page_no, count=len(ended))
+            return set(ended)
+        except Exception as e:
+            # 체크박스/버튼 셀렉터가 맞지 않으면 다른 페이지도 같으므로 이번 실행은 매물별로 처리
+            log.warning(f"⚠️ {page_no}페이지 일괄 노출종료 실패 (이후 매물별 처리로 진행): {e}")
+            self.bulk_end_mode = 'off'
+            self.nav[page].invalidate()
+            self.metrics.record('bulk_end', started, 'error', page=page_no)
+            if clicked:
+                # 클릭 이후 상태를 모르는 매물은 종료로 기록 (아직 노출 중이면 종료매물 목록에서 찾지 못해 실패로 남음)
+                log.warning(f"⚠️ 클릭 후 상태 확인 실패 - 종료로 기록: {', '.join(clicked)}")
+                self.record_bulk_ended(clicked)
+            return set(clicked)
+    
+    def record_bulk_ended(self, property_numbers):
+        """일괄 노출종료된 매물을 저널에 기록하고 광고중 인덱스에서 제거"""
+        for number in property_numbers:
+            self.record_phase(number, 'end')
+            self.ad_list_index.remove(number)
+    
+    async def process_single_property(self, page, property_number, index, total, retry=False):
+        """단일 매물 처리 (전체 소요 시간 기록)"""
+        current_property.set(property_number)
+        started = time.perf_counter()
+        current_started.set(started)
+        current_phase.set('locate')
+        success = await self._process_single_property(page, property_number, index, total, retry)
+        self.metrics.record('property', started, 'ok' if success else 'fail', retry=retry)
+        return success
+    
+    async def _process_single_property(self, page, property_number, index, total, retry):
+        """단일 매물 처리 (인덱스 위치 우선, 실패 시 페이지네이션 검색)"""
+        retry_text = " (재시도)" if retry else ""
+        log.debug(f"\n{'='*60}")
+        log.info(f"[{index}/{total}] 매물번호 {property_number} 처리 시작{retry_text}")
+        log.debug(f"{'='*60}")
+        
+        # 이전 실행 기록 확인 (완료/결제 불확실 매물은 다시 처리하지 않음)
+        resume_phase = 'end'
+        if self.journal:
+            if self.journal.is_complete(property_number):
+                log.info(f"⏭️ 매물번호 {property_number}는 이전 실행에서 결제까지 완료됨 - 건너뜀")
+                return True
+            if self.journal.payment_uncertain(property_number):
+                log.warning(f"⚠️ 매물번호 {property_number}는 결제 도중 중단됨 - 이중 결제 방지를 위해 건너뜀 (수동 확인 필요)")
+                self.note_failure('payment_uncertain')
+                return False
+            if self.journal.last_completed(property_number):
+                log.info(f"🔁 이전 실행 기록: '{self.journal.last_completed(property_number)}' 단계까지 완료")
+                resume_phase = 'ad_end'
+        if resume_phase == 'end' and property_number in self.bulk_ended:
+            log.info("📦 일괄 노출종료로 이미 종료됨")
+            resume_phase = 'ad_end'
+        
+        # 재시도 간 대기는 재시도 엔진의 실패 유형별 백오프로 처리됨
+        if retry:
+            log.info("🔄 재시도 모드: 마지막 완료 단계 이후부터 다시 진행")
+        
+        nav = self.nav[page]
+        
+        try:
+            # 이전 매물에서 셀렉터 고장이 확인됐으면 시간 초과를 기다리지 않고 바로 실패
+            self.selectors.ensure_healthy()
             
-            if page_load_popup_handled:
-                print("✅ 페이지 로드 팝업 처리됨")
+            # 인덱스 위치 페이지가 이미 열려 있으면 목록/검색 이동 없이 그 페이지부터 확인
+            location = self.ad_list_index.lookup(property_number)
+            reuse_page = resume_phase == 'end' and location and nav.is_on(page, 'active', location[0])
+            if reuse_page:
+                log.debug(f"♻️ 이미 열린 {location[0]}페이지 재사용")
+                self.metrics.count('list_reuse')
+            else:
+                await self.open_ad_list(page)
             
-            print("📋 매물 테이블 로딩 대기 중...")
-            await page.wait_for_selector('table tbody tr', timeout=30000)
+            # 노출종료가 끝난 매물은 광고중 목록에 없으므로 검색 없이 종료매물 단계부터 재개
+            if resume_phase != 'end':
+                success = await self.execute_real_update(page, None, property_number, start_phase=resume_phase)
+                self.ad_list_index.remove(property_number)
+                return success
             
-            # 매물 검색 (페이지네이션 포함)
-            property_found = False
+            property_record = None
             current_page = 1
-            max_pages = 10
             
-            while not property_found and current_page <= max_pages:
-                print(f"📄 {current_page}페이지에서 매물 검색 중...")
-                
-                # 테이블 찾기
-                await page.wait_for_selector('table tbody tr', timeout=30000)
-                rows = await page.query_selector_all('table tbody tr')
-                
-                print(f"📊 {current_page}페이지 매물 수: {len(rows)}개")
+            # 인덱스에 위치가 없을 때만 서버 검색으로 목록을 매물 하나로 좁혀 바로 찾기
+            if reuse_page:
+                current_page = location[0]
+            elif self.search_mode != 'off' and not location:
+                property_record = await self.search_property(page, property_number)
+                if not property_record:
+                    # 검색으로 좁혀진 목록을 원래 목록으로 복원 후 페이지 검색 (입력창이 없었으면 그대로 재사용)
+                    await self.open_ad_list(page)
+            
+            # 인덱스에 기록된 페이지로 바로 이동
+            if property_record:
+                location = None
+            if location:
+                log.debug(f"🗂️ 인덱스 위치: {location[0]}페이지 {location[1]}행")
+                if location[0] > current_page:
+                    current_page = await self.goto_list_page(page, location[0], property_number)
                 
-                # 현재 페이지에서 매물 검색
-                for i, row in enumerate(rows, 1):
-                    try:
-                        # 매물번호가 있는 셀 찾기 (더 정확한 방법)
-                        number_cell = await row.query_selector('td:nth-child(3) > div.numberN')
-                        if number_cell:
-                            number_text = await number_cell.inner_text()
-                            if property_number in number_text.strip():
-                                print(f"🎯 매물번호 {property_number} 발견! ({current_page}페이지, 행 {i})")
-                                
-                                # 매물 정보 출력
-                                await self.print_property_info(row, property_number)
-                                
-                                # 업데이트 실행
-                                if self.test_mode:
-                                    await self.simulate_update(property_number)
-                                else:
-                                    await self.execute_real_update(page, row, property_number)
-                                
-                                property_found = True
-                                break
-                    except Exception as e:
-                        print(f"⚠️ 행 {i} 처리 중 오류: {e}")
-                        continue
+                # 앞 매물 재등록으로 한 칸 밀린 경우를 위해 다음 페이지까지 확인
+                for _ in range(2):
+                    property_record = await self.find_row_on_page(page, property_number, current_page)
+                    if property_record or current_page >= self.max_pages:
+                        break
+                    if not await self.go_to_next_page(page, current_page, property_number):
+                        break
+                    current_page += 1
                 
-                if property_found:
+                if not property_record:
+                    log.warning("⚠️ 인덱스 위치에서 찾지 못해 전체 페이지 검색으로 전환")
+                    await self.open_ad_list(page)
+                    current_page = 1
+            
+            # 브라우저로 페이지를 넘기며 찾기 전에 HTTP로 목록을 읽어 위치 확인
+            if not property_record and self.http_client:
+                http_location, scanned_all = await self.http_locate(property_number)
+                if http_location:
+                    log.debug(f"🌐 HTTP 조회 위치: {http_location[0]}페이지 {http_location[1]}행")
+                    if http_location[0] != current_page:
+                        await self.open_ad_list(page)
+                        current_page = 1
+                        if http_location[0] > 1:
+                            current_page = await self.goto_list_page(page, http_location[0], property_number)
+                elif scanned_all:
+                    log.error(f"❌ 매물번호 {property_number}가 광고중 목록에 없습니다 (HTTP 전체 조회).")
+                    self.note_failure('not_found')
+                    return False
+            
+            # 매물 검색 (페이지네이션 포함)
+            while not property_record and current_page <= self.max_pages:
+                property_record = await self.find_row_on_page(page, property_number, current_page)
+                if property_record:
                     break
                 
                 # 다음 페이지로 이동
-                try:
-                    next_button = await page.query_selector('#wrap > div > div > div > div.sectionWrap > div.singleSection.listSection > div.pagination > span:nth-child(5) > a')
-                    if next_button:
-                        button_class = await next_button.get_attribute('class')
-                        if button_class and 'disabled' in button_class:
-                            print("마지막 페이지에 도달했습니다.")
-                            break
-
-                        # 페이지네이션 팝업 처리 준비
-                        pagination_popup_handled = False
-                        async def handle_pagination_popup(dialog):
-                            nonlocal pagination_popup_handled
-                            print(f"🚨 페이지네이션 중 팝업 감지!")
-                            print(f"   타입: {dialog.type}")
-                            print(f"   메시지: '{dialog.message}'")
-
-                            try:
-                                await dialog.accept()
-                                pagination_popup_handled = True
-                                print("✅ 페이지네이션 팝업 확인 완료")
-                            except Exception as e:
-                                print(f"❌ 페이지네이션 팝업 처리 중 오류: {e}")
-                                try:
-                                    await dialog.dismiss()
-                                    print("🔄 페이지네이션 팝업 취소로 처리")
-                                except:
-                                    print("❌ 페이지네이션 팝업 처리 실패")
-
-                        # 기존 리스너 제거 후 새 리스너 등록
-                        page.remove_listener('dialog', handle_page_load_popup)
-                        page.on('dialog', handle_pagination_popup)
-
-                        print(f"📄 {current_page+1}페이지로 이동 중...")
-                        await next_button.click()
-
-                        # 페이지네이션 후 팝업 처리 및 로딩 대기
-                        await page.wait_for_timeout(5000)  # 더 긴 대기 시간
-
-                        # 팝업 오버레이 처리
-                        await handle_popup_overlay()
-
-                        if pagination_popup_handled:
-                            print("✅ 페이지네이션 팝업 처리됨")
-
-                        # 새 페이지 로딩 대기
-                        try:
-                            await page.wait_for_selector('table tbody tr', timeout=15000)
-                            print(f"✅ {current_page+1}페이지 로딩 완료")
-                        except:
-                            print(f"⚠️ {current_page+1}페이지 로딩 실패 - 계속 진행")
-
-                        current_page += 1
-
-                        # 페이지네이션 리스너 제거 후 원래 리스너 복원
-                        page.remove_listener('dialog', handle_pagination_popup)
-                        page.on('dialog', handle_page_load_popup)
-
-                    else:
-                        print("다음 페이지 버튼을 찾을 수 없습니다.")
-                        break
-                except Exception as e:
-                    print(f"페이지 이동 중 오류: {e}")
-                    # 오류 시 스크린샷 저장
-                    try:
-                        await page.screenshot(path=f"pagination_error_{property_number}_{current_page}.png")
-                        print(f"페이지네이션 오류 스크린샷 저장됨")
-                    except:
-                        pass
+                if not await self.go_to_next_page(page, current_page, property_number):
+                    current_page += 1
                     break
+                current_page += 1
             
-            if not property_found:
-                print(f"❌ 매물번호 {property_number}를 {current_page-1}페이지까지 검색했지만 찾을 수 없습니다.")
+            if not property_record:
+                log.error(f"❌ 매물번호 {property_number}를 {current_page-1}페이지까지 검색했지만 찾을 수 없습니다.")
+                self.note_failure('not_found')
                 return False
             
-            print(f"✅ 매물번호 {property_number} 처리 완료")
+            # 매물 정보 출력
+            await self.print_property_info(property_record, property_number)
+            
+            # 업데이트 실행
+            if self.test_mode:
+                await self.simulate_update(property_number)
+            else:
+                success = await self.execute_real_update(page, property_record, property_number)
+                # 재광고로 목록이 바뀌었으므로 인덱스에서 제거 (다음 조회 시 재확인)
+                self.ad_list_index.remove(property_number)
+                if not success:
+                    log.error(f"❌ 매물번호 {property_number} 업데이트 실패")
+                    return False
+            
+            log.info(f"✅ 매물번호 {property_number} 처리 완료")
             return True
             
         except Exception as e:
-            print(f"❌ 매물번호 {property_number} 처리 실패: {e}")
+            log.error(f"❌ 매물번호 {property_number} 처리 실패: {e}")
+            self.note_failure(self.retry_policy.classify(e))
             return False
-        finally:
-            # 페이지 로드 팝업 리스너 정리
-            try:
-                page.remove_listener('dialog', handle_page_load_popup)
-                print("🧹 페이지 로드 팝업 리스너 정리 완료")
-            except:
-                pass
     
-    async def print_property_info(self, row, property_number):
-        """매물 정보 출력"""
-        try:
-            cells = await row.query_selector_all('td')
-            if len(cells) >= 6:
-                name = await cells[1].inner_text() if len(cells) > 1 else "알 수 없음"
-                trade_type = await cells[3].inner_text() if len(cells) > 3 else "알 수 없음"
-                price = await cells[4].inner_text() if len(cells) > 4 else "알 수 없음"
-                
-                print(f"📋 매물 정보:")
-                print(f"   번호: {property_number}")
-                print(f"   매물명: {name.strip()}")
-                print(f"   거래종류: {trade_type.strip()}")
-                print(f"   가격: {price.strip()}")
-        except Exception as e:
-            print(f"⚠️ 매물 정보 추출 중 오류: {e}")
+    async def print_property_info(self, record, property_number):
+        """매물 정보 출력 (행 스냅샷 기준)"""
+        if record['cell_count'] >= 6:
+            log.debug(f"📋 매물 정보:")
+            log.debug(f"   번호: {property_number}")
+            log.debug(f"   매물명: {record['name'] or '알 수 없음'}")
+            log.debug(f"   거래종류: {record['trade_type'] or '알 수 없음'}")
+            log.debug(f"   가격: {record['price'] or '알 수 없음'}")
     
     async def simulate_update(self, property_number):
         """업데이트 시뮬레이션"""
-        print(f"\n🧪 매물번호 {property_number} 업데이트 시뮬레이션:")
-        print("1️⃣ 노출종료 (시뮬레이션)")
+        current_phase.set('simulate')
+        log.debug(f"\n🧪 매물번호 {property_number} 업데이트 시뮬레이션:")
+        log.debug("1️⃣ 노출종료 (시뮬레이션)")
         await asyncio.sleep(1)
-        print("2️⃣ 광고종료 (시뮬레이션)")
+        log.debug("2️⃣ 광고종료 (시뮬레이션)")
         await asyncio.sleep(1)
-        print("3️⃣ 재광고 (시뮬레이션)")
+        log.debug("3️⃣ 재광고 (시뮬레이션)")
         await asyncio.sleep(1)
-        print("4️⃣ 광고등록 (시뮬레이션)")
+        log.debug("4️⃣ 광고등록 (시뮬레이션)")
         await asyncio.sleep(1)
-        print("5️⃣ 결제완료 (시뮬레이션)")
-        print(f"🎉 매물번호 {property_number} 시뮬레이션 완료!")
+        log.debug("5️⃣ 결제완료 (시뮬레이션)")
+        log.info(f"🎉 매물번호 {property_number} 시뮬레이션 완료!")
     
-    async def execute_real_update(self, page, row, property_number):
-        """실제 업데이트 실행"""
-        print(f"\n🚀 매물번호 {property_number} 실제 업데이트:")
-        
+    async def end_exposure(self, page, record, property_number):
+        """1단계: 노출종료 버튼 클릭 및 확인 팝업 처리 (성공 여부, 확인 팝업 발생 여부)"""
+        log.debug("1️⃣ 노출종료 버튼 클릭...")
+        if not record['has_end_button']:
+            log.error("❌ 노출종료 버튼을 찾을 수 없습니다.")
+            self.note_failure('selector_timeout')
+            return False, False
+        end_button = self.row_locator(page, record).locator(self.selectors.css('end_button'))
+
         try:
-            # 1. 노출종료
-            print("1️⃣ 노출종료 버튼 클릭...")
-            end_button = await row.query_selector('#naverEnd')
-            if not end_button:
-                print("❌ 노출종료 버튼을 찾을 수 없습니다.")
-                return False
+            # 팝업 오버레이 사전 제거
+            await self.handle_popup_overlay(page)
             
-            # 팝업 처리를 위한 이벤트 리스너 등록
-            popup_handled = False
-            async def handle_popup(dialog):
-                nonlocal popup_handled
-                print(f"🚨 팝업 감지!")
-                print(f"   타입: {dialog.type}")
-                print(f"   메시지: '{dialog.message}'")
-
-                try:
-                    await dialog.accept()
-                    popup_handled = True
-                    print("✅ 팝업 확인 버튼 클릭 완료")
-                except Exception as e:
-                    print(f"❌ 팝업 처리 중 오류: {e}")
-                    try:
-                        await dialog.dismiss()
-                        print("🔄 팝업 취소 버튼으로 처리")
-                    except:
-                        print("❌ 팝업 처리 실패")
-
-            page.on('dialog', handle_popup)
-
-            # 팝업 오버레이 처리 함수 (공통 사용)
-            async def handle_popup_overlay():
-                """DOM 기반 팝업 오버레이 처리"""
-                try:
-                    await page.evaluate('''
-                        () => {
-                            // 모든 팝업 오버레이 숨기기
-                            const popups = document.querySelectorAll('img[src*="popup"], div[class*="popup"], div[id*="popup"], .modal, .overlay');
-                            popups.forEach(popup => {
-                                popup.style.display = 'none';
-                                popup.style.visibility = 'hidden';
-                                popup.remove();
-                            });
-                            
-                            // z-index가 높은 요소들도 제거
-                            const highZIndexElements = document.querySelectorAll('*');
-                            highZIndexElements.forEach(el => {
-                                const zIndex = window.getComputedStyle(el).zIndex;
-                                if (zIndex && parseInt(zIndex) > 1000) {
-                                    el.style.display = 'none';
-                                    el.remove();
-                                }
-                            });
-                        }
-                    ''')
-                    print("✅ JavaScript로 팝업 오버레이 제거 완료")
-                except Exception as e:
-                    print(f"⚠️ JavaScript 팝업 제거 실패: {e}")
-
-            try:
-                # 팝업 오버레이 사전 제거
-                await handle_popup_overlay()
+            # 노출종료 버튼 클릭
+            log.debug("🖱️ 노출종료 버튼을 클릭합니다...")
+            log.debug("⏳ 팝업 확인을 위해 대기 중...")
+            # 팝업이 실제로 뜰 때까지 대기 (최대 5초)
+            dialog = await self.dialogs[page].click_expect(end_button, timeout=5000, force=True)
+            dialog_fired = dialog is not None
+            log.debug("✅ 노출종료 버튼 클릭 완료")
+            self.metrics.count('dialog_end_fired' if dialog_fired else 'dialog_end_missing')
+            if dialog_fired:
+                log.debug("✅ 팝업 처리 완료됨")
+                # 팝업 확인 후 목록 갱신 요청 대기
+                await self.waits.network_idle(page, timeout=3000)
+            else:
+                log.debug("ℹ️ 팝업이 나타나지 않았거나 이미 처리됨")
                 
-                # 노출종료 버튼 클릭
-                print("🖱️ 노출종료 버튼을 클릭합니다...")
-                await end_button.click(force=True)  # force 옵션 추가
-                print("✅ 노출종료 버튼 클릭 완룼")
-
-                # 팝업이 나타날 시간을 기다림 (더 긴 대기 시간)
-                print("⏳ 팝업 확인을 위해 대기 중...")
-                await page.wait_for_timeout(5000)  # 5초로 증가
-
-                if popup_handled:
-                    print("✅ 팝업 처리 완료됨")
-                else:
-                    print("ℹ️ 팝업이 나타나지 않았거나 이미 처리됨")
-                    
-                print("   ✅ 노출종료 완료")
+            log.debug("   ✅ 노출종료 완료")
+            return True, dialog_fired
 
-            except Exception as e:
-                print(f"노출종료 버튼 클릭 중 오류: {e}")
-                # 스크린샷 저장 (디버깅용)
-                try:
-                    await page.screenshot(path=f"error_screenshot_{property_number}_end_button.png")
-                    print(f"오류 스크린샷 저장됨: error_screenshot_{property_number}_end_button.png")
-                except:
-                    pass
-                return False
-            finally:
-                # 이벤트 리스너 제거
-                page.remove_listener('dialog', handle_popup)
+        except Exception as e:
+            log.error(f"노출종료 버튼 클릭 중 오류: {e}")
+            self.note_failure(self.retry_policy.classify(e))
+            # 해당 매물 행만 캡처 (디버깅용)
+            path = await self.artifacts.capture(
+                page, f"error_screenshot_{property_number}_end_button", failure=True,
+                locator=self.row_locator(page, record)
+            )
+            if path:
+                log.info(f"오류 스크린샷 저장: {path}")
+            return False, False
+    
+    def record_phase(self, property_number, phase, status='done'):
+        """실행 저널에 단계 진행 기록 (테스트 모드에서는 기록하지 않음)"""
+        if self.journal:
+            self.journal.record(property_number, phase, status)
+    
+    async def execute_real_update(self, page, record, property_number, start_phase='end'):
+        """실제 업데이트 실행 (start_phase='ad_end'이면 노출종료 이후 단계부터 재개)"""
+        log.debug(f"\n🚀 매물번호 {property_number} 실제 업데이트:")
+        
+        end_dialog_fired = True
+        try:
+            # 1. 노출종료
+            if start_phase == 'end':
+                current_phase.set('end')
+                started = time.perf_counter()
+                ended, end_dialog_fired = await self.end_exposure(page, record, property_number)
+                self.nav[page].invalidate()  # 광고중 목록 내용이 바뀜
+                if not ended:
+                    self.metrics.record('end', started, 'fail')
+                    return False
+                self.metrics.record('end', started)
+                self.record_phase(property_number, 'end')
+            else:
+                log.info("⏭️ 노출종료는 이미 완료됨 - 광고종료 단계부터 재개")
             
             # 2. 광고종료
-            print("2️⃣ 광고종료 버튼 클릭...")
-            ad_end_button = await page.wait_for_selector('.statusAdEnd', timeout=10000)
+            current_phase.set('ad_end')
+            log.debug("2️⃣ 광고종료 버튼 클릭...")
+            started = time.perf_counter()
+            ad_end_button = await self.selectors.wait(page, 'ad_end_tab', timeout=10000)
+            before = await self.waits.table_signature(page)
             await ad_end_button.click()
-            await page.wait_for_timeout(3000)
-            print("   ✅ 종료매물 목록 표시")
+            # 종료매물 목록으로 테이블이 바뀔 때까지 대기 (최대 3초)
+            await self.waits.table_change(page, before, timeout=3000)
+            await self.waits.network_idle(page, timeout=3000)
+            log.debug("   ✅ 종료매물 목록 표시")
+            self.nav[page].set(page, 'ended')
+            self.metrics.record('ad_end', started)
+            self.record_phase(property_number, 'ad_end')
             
             # 3. 재광고
-            print("3️⃣ 종료매물에서 재광고 버튼 검색...")
-            end_rows = await page.query_selector_all('table tbody tr')
-            
-            for row in end_rows:
-                number_cell = await row.query_selector('td:nth-child(3) > div.numberN')
-                if number_cell:
-                    number_text = await number_cell.inner_text()
-                    if property_number in number_text.strip():
-                        re_ad_button = await row.query_selector('#reReg')
-                        if re_ad_button:
-                            await re_ad_button.click()
-                            await page.wait_for_timeout(3000)
-                            print("   ✅ 재광고 버튼 클릭 완료")
-                            break
+            current_phase.set('re_ad')
+            log.debug("3️⃣ 종료매물에서 재광고 버튼 검색...")
+            started = time.perf_counter()
+            for end_record in await self.read_page_rows(page):
+                if property_number in end_record['number'] and end_record['has_re_ad_button']:
+                    await self.row_locator(page, end_record).locator(self.selectors.css('re_ad_button')).click()
+                    self.nav[page].invalidate()  # 광고등록 화면으로 이동
+                    log.debug("   ✅ 재광고 버튼 클릭 완료")
+                    break
+            else:
+                log.error("❌ 종료매물 목록에서 재광고 버튼을 찾을 수 없습니다.")
+                # 노출종료 확인 팝업이 뜨지 않았다면 노출종료가 반영되지 않은 것
+                self.note_failure('selector_timeout' if end_dialog_fired else 'dialog_missing')
+                self.metrics.record('re_ad', started, 'fail')
+                return False
+            self.metrics.record('re_ad', started)
+            self.record_phase(property_number, 're_ad')
             
             # 4. 광고등록
-            print("4️⃣ 광고등록 페이지 처리...")
+            current_phase.set('register')
+            log.debug("4️⃣ 광고등록 페이지 처리...")
+            started = time.perf_counter()
             await page.wait_for_url('**/offerings/ad_regist', timeout=30000)
-            await page.wait_for_timeout(2000)
+            await self.waits.network_idle(page, timeout=2000)
             
-            await page.click('text=광고하기')
-            await page.wait_for_timeout(2000)
-            print("   ✅ 광고하기 버튼 클릭 완료")
+            register_button = await self.selectors.wait(page, 'register_button', timeout=10000)
+            await register_button.click()
+            log.debug("   ✅ 광고하기 버튼 클릭 완료")
+            self.metrics.record('register', started)
+            self.record_phase(property_number, 'register')
             
             # 5. 결제
-            print("5️⃣ 결제 처리...")
-            await page.wait_for_timeout(3000)
+            current_phase.set('pay')
+            log.debug("5️⃣ 결제 처리...")
+            started = time.perf_counter()
+            # 결제 동의 체크박스가 나타날 때까지 대기 (최대 5초)
+            consent = await self.selectors.wait(page, 'payment_consent', timeout=5000, state='attached')
 
-            await page.evaluate("document.querySelector('#consentMobile2').click()")
-            await page.wait_for_timeout(1000)
-            print("   ✅ 체크박스 클릭 완료")
+            await consent.evaluate("el => el.click()")
+            await self.waits.network_idle(page, timeout=1000)
+            log.debug("   ✅ 체크박스 클릭 완료")
                         
-            payment_button = await page.query_selector('#naverSendSave')
-            if payment_button:
-                await payment_button.click()
-                print("   ✅ 결제하기 버튼 클릭 완료")
+            payment_button = await page.query_selector(self.selectors.css('payment_button'))
+            if not payment_button:
+                log.error("❌ 결제하기 버튼을 찾을 수 없습니다.")
+                self.selectors.miss('payment_button')
+                self.note_failure('selector_timeout')
+                self.metrics.record('pay', started, 'fail')
+                return False
+            self.selectors.hit('payment_button')
+            
+            # 결제 클릭 직전에 기록 (완료 기록이 없으면 재시작 시 이중 결제 방지)
+            self.record_phase(property_number, 'pay', 'started')
+            await payment_button.click()
+            log.debug("   ✅ 결제하기 버튼 클릭 완료")
             
-            await page.wait_for_timeout(3000)
-            print(f"🎉 매물번호 {property_number} 실제 업데이트 완료!")
+            # 결제 요청 완료 대기 (최대 3초)
+            await self.waits.network_idle(page, timeout=3000)
+            self.metrics.record('pay', started)
+            self.record_phase(property_number, 'pay')
+            log.info(f"🎉 매물번호 {property_number} 실제 업데이트 완료!")
             
             return True
             
         except Exception as e:
-            print(f"❌ 실제 업데이트 중 오류: {e}")
+            log.error(f"❌ 실제 업데이트 중 오류: {e}")
+            self.note_failure(self.retry_policy.classify(e))
             return False
     
+    async def new_context(self, browser, storage_state=None):
+        """공통 옵션과 리소스 차단 규칙이 적용된 브라우저 컨텍스트 생성"""
+        if storage_state:
+            context = await browser.new_context(storage_state=storage_state, **self.context_options)
+        else:
+            context = await browser.new_context(**self.context_options)
+        
+        if self.resource_blocker:
+            await self.resource_blocker.attach(context)
+        await self.overlays.attach(context)
+        return context
+    
+    async def new_worker_page(self, context):
+        """팝업 처리기가 등록된 새 페이지 생성"""
+        page = await context.new_page()
+        
+        # 페이지당 하나의 팝업 처리기를 상시 등록
+        self.dialogs[page] = DialogDispatcher(self.metrics).attach(page)
+        self.nav[page] = NavigationState()
+        if self.response_monitor:
+            self.response_monitor.attach(page)
+        page.on('close', lambda closed: (self.dialogs.pop(closed, None), self.nav.pop(closed, None)))
+        return page
+    
+    def note_failure(self, kind):
+        """현재 매물 시도의 실패 유형 기록 (처음 기록된 원인 유지)"""
+        if current_failure.get() is None:
+            current_failure.set(kind)
+    
+    async def recover_login(self, page):
+        """로그인 세션이 끊긴 워커 페이지에서 다시 로그인"""
+        log.info("🔐 로그인 세션 만료 감지 - 재로그인 시도")
+        if await self.login(page):
+            self.session_cache.save(await page.context.storage_state())
+            if self.http_client:
+                await self.start_http_client(page.context)
+    
+    async def schedule_retry(self, queue, item, delay):
+        """백오프 후 재시도 항목을 큐에 다시 넣음 (넣을 때까지 원래 항목은 미완료 유지)"""
+        try:
+            await asyncio.sleep(delay)
+            await queue.put(item)
+        finally:
+            queue.task_done()
+    
+    async def feed_queue(self, queue, property_numbers):
+        """매물번호 목록 또는 비동기 스트림을 큐에 넣음 (큐가 가득 차면 빌 때까지 대기)"""
+        index = 0
+        if hasattr(property_numbers, '__aiter__'):
+            async for property_number in property_numbers:
+                index += 1
+                await queue.put((index, property_number, 1))
+        else:
+            for property_number in property_numbers:
+                index += 1
+                await queue.put((index, property_number, 1))
+    
+    async def wait_queue_drained(self, feeder, queue):
+        """입력이 끝나고 큐의 모든 작업(재시도 포함)이 완료될 때까지 대기"""
+        await feeder
+        await queue.join()
+    
+    async def property_worker(self, worker_id, page, queue, rate_limiter, results, total, retry_tasks):
+        """큐에서 매물번호를 꺼내 처리하고, 실패 유형별 백오프로 재시도를 예약하는 워커"""
+        current_worker.set(worker_id)
+        await self.start_gate.wait()
+        first = True
+        while True:
+            index, property_number, attempt = await queue.get()
+            # 동시 처리 수 한도(적응형 모드) 안에서만 처리
+            await rate_limiter.acquire()
+            try:
+                # 모든 워커 공통 시작 간격 제한 (관문이 열린 직후 첫 매물은 모든 워커가 동시에 출발)
+                if not first:
+                    await rate_limiter.wait()
+                first = False
+                if self.worker_count > 1:
+                    log.debug(f"\n👷 워커 {worker_id}: 매물번호 {property_number} 담당")
+                self.progress.start(property_number, worker_id)
+                if self.bulk_groups:
+                    await self.bulk_end_group(page, property_number)
+                
+                current_failure.set(None)
+                success = await self.process_single_property(
+                    page, property_number, index, total, retry=attempt > 1
+                )
+                results[property_number] = success
+                await rate_limiter.feedback(success, current_failure.get())
+                if success:
+                    if attempt > 1:
+                        log.info(f"✅ 재시도 성공: {property_number}")
+                    self.start_gate.mark_done()
+                    self.progress.finish(property_number, 'done')
+                    await self.artifacts.capture(page, f"done_{property_number}")
+                    queue.task_done()
+                    continue
+                
+                kind = current_failure.get() or 'unknown'
+                delay = self.retry_policy.next_delay(kind, attempt)
+                if delay is None:
+                    log.error(f"❌ 매물번호 {property_number} 최종 실패 ({kind}, {attempt}회 시도)")
+                    self.progress.finish(property_number, 'failed')
+                    await self.artifacts.capture(page, f"failed_{property_number}_{kind}", failure=True)
+                    queue.task_done()
+                    continue
+                
+                if kind == 'login_lost':
+                    await self.recover_login(page)
+                
+                self.progress.finish(property_number, 'retry')
+                self.metrics.count('retry')
+                self.metrics.count(f"retry_{kind}")
+                log.info(f"🔄 매물번호 {property_number} 실패 ({kind}) - {delay:g}초 후 재시도 ({attempt + 1}회차)")
+                retry_tasks.append(asyncio.create_task(
+                    self.schedule_retry(queue, (index, property_number, attempt + 1), delay)
+                ))
+            except Exception as e:
+                log.error(f"❌ 워커 {worker_id} 매물번호 {property_number} 처리 중 오류: {e}")
+                results[property_number] = False
+                self.progress.finish(property_number, 'failed')
+                queue.task_done()
+            finally:
+                await rate_limiter.release()
+    
+    async def process_queue(self, pages, property_numbers, total=None):
+        """작업 큐로 매물 처리 (페이지당 워커 1개, 실패 매물은 다른 매물과 함께 재시도)
+        
+        property_numbers는 목록 또는 비동기 스트림이며, 스트림은 STREAM_BUFFER 건까지만 미리 읽는다.
+        """
+        queue = asyncio.Queue(self.stream_buffer if total is None else 0)
+        feeder = asyncio.create_task(self.feed_queue(queue, property_numbers))
+        
+        if self.response_monitor:
+            rate_limiter = AdaptiveThrottle(
+                self.property_interval, self.throttle_min_interval, self.throttle_max_interval,
+                len(pages), self.response_monitor, self.metrics,
+                self.throttle_target_ms, self.throttle_step
+            )
+        else:
+            rate_limiter = RateLimiter(self.property_interval)
+        results = {}
+        retry_tasks = []
+        workers = [
+            asyncio.create_task(self.property_worker(
+                worker_id, page, queue, rate_limiter, results, total or '?', retry_tasks
+            ))
+            for worker_id, page in enumerate(pages, 1)
+        ]
+        join_task = asyncio.create_task(self.wait_queue_drained(feeder, queue))
+        try:
+            # 모든 작업이 끝나거나 워커가 전부 중단될 때까지 대기
+            pending = set(workers)
+            while not join_task.done() and pending:
+                done, pending = await asyncio.wait(pending | {join_task}, return_when=asyncio.FIRST_COMPLETED)
+                pending.discard(join_task)
+                for task in done:
+                    if task is not join_task and task.exception():
+                        log.error(f"❌ 워커 중단: {task.exception()}")
+            if join_task.done() and join_task.exception():
+                log.error(f"❌ 매물 입력 읽기 실패: {join_task.exception()}")
+        finally:
+            for task in workers + retry_tasks + [feeder, join_task]:
+                task.cancel()
+            await asyncio.gather(*workers, *retry_tasks, feeder, join_task, return_exceptions=True)
+        if isinstance(rate_limiter, AdaptiveThrottle):
+            self.throttle_summary = rate_limiter.summary()
+            log.info(f"🎚️ 최종 처리 간격 {rate_limiter.interval:g}초 (최소 {rate_limiter.fastest_interval:g}초), "
+                  f"동시 처리 {rate_limiter.limit}/{rate_limiter.max_concurrency}개, 감속 {rate_limiter.backoffs}회")
+        return results
+    
+    async def run_worker_pool(self, browser, storage_state, property_numbers, total=None):
+        """로그인 상태를 공유하는 컨텍스트 풀로 매물 병렬 처리 (매물번호 -> 성공 여부)"""
+        worker_count = self.worker_count if total is None else min(self.worker_count, total)
+        pacing = '응답에 따라 자동 조절' if self.response_monitor else '고정'
+        log.info(f"👷 워커 {worker_count}개로 병렬 처리 ({self.property_interval:g}초 간격 제한, {pacing})")
+        
+        contexts = []
+        try:
+            pages = []
+            for _ in range(worker_count):
+                context = await self.new_context(browser, storage_state)
+                contexts.append(context)
+                pages.append(await self.new_worker_page(context))
+            
+            if self.start_gate.pending:
+                # 시작 시각 전이면 워커 페이지도 매물 리스트까지 미리 열어 둠
+                warmed = await asyncio.gather(*(self.open_ad_list(p) for p in pages), return_exceptions=True)
+                log.info(f"🔥 워커 페이지 사전 준비: {sum(1 for result in warmed if not isinstance(result, Exception))}/{len(pages)}개")
+            
+            return await self.process_queue(pages, property_numbers, total)
+        finally:
+            for context in contexts:
+                try:
+                    await context.close()
+                except:
+                    pass
+    
+    async def stop_tracing(self, context):
+        """Playwright 트레이스 저장 (TRACE_PATH 설정 시)"""
+        if not self.trace_path:
+            return
+        os.makedirs(os.path.dirname(self.trace_path) or '.', exist_ok=True)
+        await context.tracing.stop(path=self.trace_path)
+        log.info(f"🧭 Playwright 트레이스 저장: {self.trace_path}")
+    
+    async def flush_artifacts(self):
+        """백그라운드 스크린샷 저장 완료 대기 및 집계"""
+        await self.artifacts.flush()
+        self.metrics.counters['artifact_captured'] = self.artifacts.captured_count
+        self.metrics.counters['artifact_rotated'] = self.artifacts.rotated_count
+        if self.artifacts.captured_count:
+            log.info(f"📸 스크린샷 {self.artifacts.captured_count}장 저장 ({self.artifacts.directory}, 정리 {self.artifacts.rotated_count}장)")
+        self.artifacts.captured_count = self.artifacts.rotated_count = 0  # 상주 모드는 배치별로 집계
+    
+    def write_run_report(self):
+        """단계별 소요 시간 리포트(JSON) 저장 및 요약 출력"""
+        try:
+            report = self.metrics.write_report(self.report_path)
+        except OSError as e:
+            log.warning(f"⚠️ 실행 리포트 저장 실패: {e}")
+            return
+        
+        log.info(f"\n⏱️ 단계별 소요 시간 (총 {report['elapsed_s']}초)")
+        for name, stats in sorted(report['phases'].items(), key=lambda item: -item[1]['total_ms']):
+            log.info(f"   {name}: {stats['count']}회, 합계 {stats['total_ms']/1000:.1f}초, 평균 {stats['avg_ms']}ms, 최대 {stats['max_ms']}ms")
+        log.info(f"📝 실행 리포트: {self.report_path}")
+    
+    async def launch_browser(self, playwright):
+        """headless Chromium 실행"""
+        # GitHub Actions에서는 항상 headless 모드로 실행
+        return await playwright.chromium.launch(
+            headless=True,
+            slow_mo=self.slow_mo,  # 운영 환경에서는 SLOW_MO=0
+            args=[
+                '--disable-blink-features=AutomationControlled',
+                '--no-sandbox',
+                '--disable-setuid-sandbox',
+                '--disable-dev-shm-usage',
+                '--disable-accelerated-2d-canvas',
+                '--no-first-run',
+                '--no-zygote',
+                '--disable-gpu',
+                '--disable-web-security'
+            ]
+        )
+    
+    async def release_start_gate(self, page, planned):
+        """시작 시각까지 기다린 뒤 일괄 노출종료를 거쳐 워커 출발 (오류가 나도 관문은 반드시 열림)
+
+        START_AT이 있으면 출발이 늦어지지 않도록 바로 열고, 일괄 노출종료는 워커가 페이지 묶음을 처음 만날 때 한다.
+        """
+        try:
+            await self.start_gate.wait_for_start()
+            # 같은 페이지 매물은 노출종료를 한 번에 처리하고 재광고/결제만 매물별로 진행
+            if planned is not None and self.start_gate.start_at and self.bulk_end_mode == 'auto' and not self.test_mode:
+                self.bulk_groups = self.bulk_end_groups(planned)
+                if self.bulk_groups:
+                    log.info(f"📦 일괄 노출종료: {len(self.bulk_groups)}개 페이지는 출발 후 워커가 처리")
+            elif planned is not None and self.bulk_end_mode == 'auto' and not self.test_mode:
+                self.bulk_ended = await self.bulk_end_exposure(page, planned)
+                if self.bulk_ended:
+                    for nav in self.nav.values():
+                        nav.invalidate()  # 미리 열어 둔 워커 페이지의 목록도 바뀜
+        finally:
+            self.start_gate.open()
+            if self.start_gate.start_at:
+                log.info(f"🏁 출발: {self.start_gate.released_at.isoformat(sep=' ', timespec='milliseconds')}")
+    
+    async def process_batch(self, browser, context, page):
+        """로그인된 페이지로 self.property_numbers 전체 처리 후 결과(outcome) 반환"""
+        # 매물 리스트 1회 순회로 위치 인덱스 생성
+        with self.metrics.phase('index'):
+            await self.build_ad_list_index(page)
+        
+        if self.property_source:
+            # 입력을 읽는 대로 처리 (정렬 없이 입력 순서, 제외 여부는 매물별로 판단)
+            skipped = {}
+            planned = self.stream_properties(skipped)
+            total = None
+        else:
+            # 중복/불필요 작업 제외 및 페이지 순서 정렬
+            planned, skipped = self.plan_properties()
+            total = len(planned)
+        
+        self.progress.reset(total, len(skipped))
+        
+        # 워커는 준비를 마친 뒤 관문에서 대기하다 시작 시각(START_AT)에 함께 출발
+        self.start_gate = StartGate(StartGate.parse(self.start_at), self.start_max_wait)
+        gate_task = asyncio.create_task(self.release_start_gate(page, None if total is None else planned))
+        try:
+            if self.worker_count > 1:
+                # 로그인 쿠키를 공유하는 워커 컨텍스트 풀로 병렬 처리
+                storage_state = await context.storage_state()
+                results = await self.run_worker_pool(browser, storage_state, planned, total)
+            else:
+                # 로그인한 페이지 하나로 순차 처리
+                results = await self.process_queue([page], planned, total)
+        finally:
+            gate_task.cancel()
+            self.progress.close()
+        
+        # 이미 결제까지 끝난 매물은 성공으로 집계
+        success_count = sum(1 for reason in skipped.values() if reason == SKIP_COMPLETED)
+        # 실패 매물은 처리 중 유형별 백오프로 이미 재시도됨
+        success_count += sum(1 for success in results.values() if success)
+        retry_failed = [num for num, success in results.items() if not success]
+        # 노출 중이 아니거나 목록에 없어 제외된 매물은 재광고되지 않았으므로 실패로 집계
+        not_exposed = [num for num, reason in skipped.items() if reason != SKIP_COMPLETED]
+        requested_count = self.streamed_count if self.property_source else len(self.property_numbers)
+
+        # 최종 결과
+        log.info("\n" + "="*80)
+        log.info("📊 다중 매물 자동화 완료!")
+        log.info(f"✅ 최종 성공: {success_count}/{requested_count}개")
+        if retry_failed:
+            log.error(f"❌ 최종 실패: {', '.join(retry_failed)}")
+        if not_exposed:
+            log.error(f"❌ 제외(재광고 안 됨): {', '.join(f'{num} ({skipped[num]})' for num in not_exposed)}")
+        if not retry_failed and not not_exposed:
+            log.info("🎉 모든 매물 처리 완료!")
+        start = self.start_gate.summary()
+        if start['start_at'] and start['first_done_s'] is not None:
+            log.info(f"🏁 시작 시각 기준 첫 완료 {start['first_done_s']}초, 마지막 완료 {start['last_done_s']}초")
+        log.info("="*80)
+        
+        self.metrics.outcome = {
+            'shard': f"{self.shard_index + 1}/{self.shard_count}",
+            'total': requested_count,
+            'success_count': success_count,
+            'failed': retry_failed + not_exposed,
+            'skipped': skipped,
+            'start': self.start_gate.summary(),
+            'throttle': self.throttle_summary
+        }
+        return self.metrics.outcome
+    
     async def run_automation(self):
         """다중 매물 자동화 실행"""
-        print("\n" + "="*80)
-        print(f"🚀 다중 매물 자동화 시작 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("="*80)
+        log.info("\n" + "="*80)
+        log.info(f"🚀 다중 매물 자동화 시작 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        log.info("="*80)
         
-        if not self.property_numbers:
-            print("❌ 처리할 매물번호가 없습니다.")
+        if not self.property_numbers and not self.property_source:
+            log.error("❌ 처리할 매물번호가 없습니다.")
             return
         
         async with async_playwright() as p:
             try:
-                # GitHub Actions에서는 항상 headless 모드로 실행
-                browser = await p.chromium.launch(
-                    headless=True,
-                    slow_mo=500,  # 빠른 실행
-                    args=[
-                        '--disable-blink-features=AutomationControlled',
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-accelerated-2d-canvas',
-                        '--no-first-run',
-                        '--no-zygote',
-                        '--disable-gpu',
-                        '--disable-web-security'
-                    ]
-                )
+                browser = await self.launch_browser(p)
                 
-                context = await browser.new_context(
-                    viewport={'width': 1280, 'height': 720},
-                    user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-                )
+                # 저장된 로그인 세션이 있으면 컨텍스트에 복원
+                cached_state = self.session_cache.load()
+                context = await self.new_context(browser, cached_state)
                 
-                page = await context.new_page()
+                if self.trace_path:
+                    await context.tracing.start(screenshots=True, snapshots=True)
                 
-                # 전역 팝업 처리 함수
-                async def handle_global_popup(dialog):
-                    print(f"전역 팝업 감지: {dialog.type} - {dialog.message}")
-                    try:
-                        if dialog.type == 'alert':
-                            await dialog.accept()
-                            print("Alert 팝업 확인됨")
-                        elif dialog.type == 'confirm':
-                            await dialog.accept()  # 확인 선택
-                            print("Confirm 팝업 확인됨")
-                        elif dialog.type == 'prompt':
-                            await dialog.accept("")  # 빈 값으로 확인
-                            print("Prompt 팝업 확인됨")
-                    except Exception as e:
-                        print(f"팝업 처리 중 오류: {e}")
-
-                # 전역 팝업 이벤트 리스너 등록
-                page.on('dialog', handle_global_popup)
+                page = await self.new_worker_page(context)
                 
-                # 로그인
-                login_success = await self.login(page)
+                # 로그인 (세션 재사용 우선)
+                login_success = await self.ensure_login(context, page, cached_state is not None)
                 if not login_success:
-                    print("❌ 로그인 실패로 자동화 중단")
+                    log.error("❌ 로그인 실패로 자동화 중단")
                     return
+                await self.start_http_client(context)
                 
-                # 각 매물 순차 처리
-                success_count = 0
-                failed_properties = []
-                retry_failed = []  # 전역 변수로 선언
-
-                for i, property_number in enumerate(self.property_numbers, 1):
-                    success = await self.process_single_property(page, property_number, i, len(self.property_numbers))
-                    
-                    if success:
-                        success_count += 1
-                    else:
-                        failed_properties.append(property_number)
-                    
-                    # 매물 간 대기
-                    if i < len(self.property_numbers):
-                        print(f"⏳ 다음 매물 처리까지 5초 대기...")
-                        await page.wait_for_timeout(5000)
-
-                # 🔄 실패한 매물 재시도 로직 추가
-                if failed_properties:
-                    print(f"\n🔄 실패한 {len(failed_properties)}개 매물 재시도 중...")
-                    print("="*60)
-                    
-                    # retry_failed 이미 전역 변수로 선언됨
-                    for i, property_number in enumerate(failed_properties, 1):
-                        print(f"\n[재시도 {i}/{len(failed_properties)}] 매물번호 {property_number}")
-                        success = await self.process_single_property(page, property_number, i, len(failed_properties), retry=True)
-                        
-                        if success:
-                            success_count += 1
-                            print(f"✅ 재시도 성공: {property_number}")
-                        else:
-                            retry_failed.append(property_number)
-                            print(f"❌ 재시도 실패: {property_number}")
-                        
-                        # 재시도 간 대기
-                        if i < len(failed_properties):
-                            await page.wait_for_timeout(3000)
-
-                # 최종 결과
-                print("\n" + "="*80)
-                print("📊 다중 매물 자동화 완료!")
-                print(f"✅ 최종 성공: {success_count}/{len(self.property_numbers)}개")
-                if retry_failed:
-                    print(f"❌ 최종 실패: {', '.join(retry_failed)}")
-                else:
-                    print("🎉 모든 매물 처리 완료!")
-                print("="*80)
+                outcome = await self.process_batch(browser, context, page)
                 
-                # 최종 스크린샷
-                screenshot_path = f"multi_automation_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                await page.screenshot(path=screenshot_path)
-                print(f"📸 최종 스크린샷: {screenshot_path}")
+                # 최종 스크린샷 (실패 매물이 있으면 실패 캡처로 취급)
+                screenshot_path = await self.artifacts.capture(
+                    page, f"multi_automation_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                    failure=bool(outcome['failed'])
+                )
+                if screenshot_path:
+                    log.info(f"📸 최종 스크린샷: {screenshot_path}")
+                
+                if self.resource_blocker:
+                    log.info(f"🚫 차단된 리소스 요청: {self.resource_blocker.blocked_count}건")
+                if self.http_client:
+                    log.info(f"🌐 HTTP 목록 조회: {self.http_client.request_count}건")
                 
+                await self.stop_tracing(context)
                 await browser.close()
                 
             except Exception as e:
-                print(f"❌ 자동화 실행 실패: {e}")
+                log.error(f"❌ 자동화 실행 실패: {e}")
+                self.metrics.outcome.setdefault('error', str(e))
                 try:
+                    await self.stop_tracing(context)
                     await browser.close()
                 except:
                     pass
+            finally:
+                self.stop_http_client()
+                await self.flush_artifacts()
+                self.write_run_report()
+
+class DaemonServer:
+    """로그인된 브라우저를 띄워 둔 채 로컬 소켓으로 매물 배치를 받아 처리하는 상주 모드
 
-async def main():
-    automation = MultiPropertyAutomation()
-    await automation.run_automation()
+    요청/응답은 한 줄짜리 JSON이다: {"properties": ["123", ...]} -> 배치 결과,
+    {"command": "status"} -> 상태, {"command": "stop"} -> 종료.
+    컨텍스트는 N개 매물 처리 후 또는 JS 힙 사용량이 상한을 넘으면 로그인 상태를 유지한 채 새로 만든다.
+    """
+
+    def __init__(self, automation, host, port, recycle_after, max_heap_mb):
+        self.automation = automation
+        self.host = host
+        self.port = port
+        self.recycle_after = recycle_after
+        self.max_heap_mb = max_heap_mb
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.processed_in_context = 0
+        self.batch_count = 0
+        self.lock = asyncio.Lock()  # 배치는 한 번에 하나씩
+        self.stopped = asyncio.Event()
+
+    async def open_context(self, storage_state=None):
+        """로그인된 컨텍스트/페이지 준비 (storage_state가 없으면 세션 캐시 사용)"""
+        automation = self.automation
+        if storage_state is None:
+            storage_state = automation.session_cache.load()
+        self.context = await automation.new_context(self.browser, storage_state)
+        self.page = await automation.new_worker_page(self.context)
+        self.processed_in_context = 0
+        if not await automation.ensure_login(self.context, self.page, storage_state is not None):
+            raise RuntimeError("로그인 실패")
+        await automation.start_http_client(self.context)
+
+    async def heap_mb(self):
+        try:
+            used = await self.page.evaluate('performance.memory ? performance.memory.usedJSHeapSize : 0')
+            return used / (1024 * 1024)
+        except Exception:
+            return 0
+
+    async def recycle_if_needed(self, force=False):
+        """처리 수/메모리 기준을 넘었으면 쿠키를 넘겨받은 새 컨텍스트로 교체"""
+        reason = '오류 후 복구' if force else None
+        if not reason and self.recycle_after and self.processed_in_context >= self.recycle_after:
+            reason = f"매물 {self.processed_in_context}개 처리"
+        if not reason and self.max_heap_mb:
+            heap = await self.heap_mb()
+            if heap >= self.max_heap_mb:
+                reason = f"JS 힙 {heap:.0f}MB"
+        if not reason:
+            return
+        
+        log.info(f"♻️ 브라우저 컨텍스트 재생성 ({reason})")
+        storage_state = None
+        try:
+            storage_state = await self.context.storage_state()
+            await self.context.close()
+        except Exception:
+            pass
+        await self.open_context(storage_state)
+
+    async def run_batch(self, property_numbers):
+        automation = self.automation
+        async with self.lock:
+            self.batch_count += 1
+            automation.property_numbers = list(dict.fromkeys(property_numbers))
+            automation.property_source = ''
+            automation.ad_list_index = AdListIndex()  # 배치 사이에 목록이 바뀌므로 새로 생성
+            for nav in automation.nav.values():
+                nav.invalidate()  # 배치 사이에 열려 있던 화면은 최신이 아닐 수 있음
+            automation.metrics.reset()
+            automation.selectors.reset()  # 이전 배치의 고장 판정은 사이트 복구 후에도 남지 않도록 초기화
+            automation.reset_batch_state()
+            report_root, report_ext = os.path.splitext(automation.base_report_path)
+            automation.report_path = f"{report_root}_{automation.metrics.started_at.strftime('%Y%m%d_%H%M%S')}{report_ext}"
+            if automation.journal:
+                # 같은 날 같은 매물을 다시 요청할 수 있으므로 배치마다 실행 ID 분리
+                automation.journal = RunJournal(automation.journal.path, f"daemon_{automation.metrics.started_at.strftime('%Y%m%d_%H%M%S')}")
+            
+            log.info(f"\n📥 배치 #{self.batch_count}: 매물 {len(automation.property_numbers)}개 ({', '.join(automation.property_numbers)})")
+            recycle = False
+            try:
+                await self.recycle_if_needed()
+                if not automation.http_client:
+                    # 이전 배치에서 중단된 HTTP 목록 조회도 배치마다 다시 시도
+                    await automation.start_http_client(self.context)
+                await automation.process_batch(self.browser, self.context, self.page)
+            except Exception as e:
+                log.error(f"❌ 배치 처리 실패: {e}")
+                automation.metrics.outcome.setdefault('error', str(e))
+                recycle = True
+            finally:
+                self.processed_in_context += len(automation.property_numbers)
+                await automation.flush_artifacts()
+                automation.write_run_report()
+            
+            if recycle:
+                try:
+                    await self.recycle_if_needed(force=True)
+                except Exception as e:
+                    log.warning(f"⚠️ 컨텍스트 복구 실패 (다음 배치에서 재시도): {e}")
+            return dict(automation.metrics.outcome, elapsed_s=round(time.perf_counter() - automation.metrics.started, 1))
+
+    def status(self):
+        return {
+            'batches': self.batch_count,
+            'processed_in_context': self.processed_in_context,
+            'busy': self.lock.locked(),
+            'progress': self.automation.progress.snapshot()
+        }
+
+    async def handle_client(self, reader, writer):
+        try:
+            request = json.loads(await reader.readline() or '{}')
+            properties = request.get('properties') if isinstance(request, dict) else None
+            if not isinstance(request, dict):
+                response = {'error': '요청은 JSON 객체여야 합니다.'}
+            elif request.get('command') == 'stop':
+                async with self.lock:  # 진행 중인 배치는 끝까지 처리
+                    self.stopped.set()
+                response = {'stopping': True}
+            elif request.get('command') == 'status':
+                response = self.status()
+            elif properties is not None and not isinstance(properties, list):
+                response = {'error': 'properties는 매물번호 배열이어야 합니다.'}
+            elif properties and any(not isinstance(num, (str, int)) or isinstance(num, bool) for num in properties):
+                response = {'error': 'properties의 매물번호는 문자열 또는 숫자여야 합니다.'}
+            elif properties and any(str(num).strip() for num in properties):
+                response = await self.run_batch([str(num).strip() for num in properties if str(num).strip()])
+            else:
+                response = {'error': 'properties 또는 command가 필요합니다.'}
+        except ValueError as e:
+            response = {'error': f"잘못된 요청: {e}"}
+        writer.write((json.dumps(response, ensure_ascii=False) + '\n').encode('utf-8'))
+        try:
+            await writer.drain()
+            writer.close()
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+    async def serve(self):
+        async with async_playwright() as p:
+            self.browser = await self.automation.launch_browser(p)
+            try:
+                await self.open_context()
+                server = await asyncio.start_server(self.handle_client, self.host, self.port)
+                log.info(f"🟢 상주 모드 대기 중: {self.host}:{self.port} (컨텍스트 재생성: 매물 {self.recycle_after}개 / JS 힙 {self.max_heap_mb}MB)")
+                async with server:
+                    await self.stopped.wait()
+                log.info("🛑 상주 모드 종료")
+            finally:
+                self.automation.stop_http_client()
+                await self.browser.close()
+
+async def send_daemon_request(host, port, request):
+    """상주 모드 서버에 요청 1건 전송 후 응답 반환"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write((json.dumps(request, ensure_ascii=False) + '\n').encode('utf-8'))
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    writer.close()
+    await writer.wait_closed()
+    return response
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='다중 매물 자동 업데이트')
+    parser.add_argument('--shard-index', type=int, default=int(os.getenv('SHARD_INDEX', '0')),
+                        help='이 실행이 맡을 샤드 번호 (0부터 시작)')
+    parser.add_argument('--shard-count', type=int, default=int(os.getenv('SHARD_COUNT', '1')),
+                        help='전체 샤드 수')
+    parser.add_argument('--merge-reports', nargs='+', metavar='REPORT',
+                        help='자동화 대신 샤드별 실행 리포트를 병합')
+    parser.add_argument('--output', help='병합 리포트 저장 경로')
+    parser.add_argument('--input', metavar='PATH',
+                        help="매물번호를 읽을 CSV/JSONL/텍스트 파일 ('-'이면 표준입력에서 읽으며 처리, PROPERTY_SOURCE와 동일)")
+    parser.add_argument('--input-format', choices=['csv', 'jsonl', 'text'],
+                        help='입력 형식 (기본: 확장자로 판단)')
+    parser.add_argument('--run-id', metavar='RUN_ID',
+                        help='이 실행 ID의 저널을 이어서 처리 (중단된 실행 재개, RUN_ID와 동일)')
+    parser.add_argument('--serve', action='store_true',
+                        help='브라우저를 띄워 둔 채 로컬 소켓으로 매물 배치를 받는 상주 모드')
+    parser.add_argument('--submit', metavar='NUMBERS',
+                        help='실행 중인 상주 모드에 매물번호 배치 전송 (콤마로 구분)')
+    parser.add_argument('--stop', action='store_true', help='실행 중인 상주 모드 종료')
+    parser.add_argument('--status', action='store_true', help='실행 중인 상주 모드의 진행 현황 조회')
+    args = parser.parse_args()
+    if args.shard_count < 1 or not 0 <= args.shard_index < args.shard_count:
+        parser.error('--shard-index는 0 이상 --shard-count 미만이어야 합니다.')
+    return args
+
+def write_merged_report(paths, output):
+    """샤드 리포트 병합 결과 저장 및 요약 출력"""
+    report = merge_run_reports(paths)
+    output = output or f"results/run_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    
+    outcome = report['outcome']
+    log.info(f"🧩 샤드 리포트 {len(report['shards'])}개 병합")
+    log.info(f"✅ 최종 성공: {outcome['success_count']}/{outcome['total']}개")
+    if outcome['failed']:
+        log.error(f"❌ 최종 실패: {', '.join(outcome['failed'])}")
+    log.info(f"📝 병합 리포트: {output}")
+
+async def main(args):
+    host = os.getenv('DAEMON_HOST', '127.0.0.1')
+    port = int(os.getenv('DAEMON_PORT', '8770'))
+    
+    if args.submit or args.stop or args.status:
+        if args.stop or args.status:
+            request = {'command': 'stop' if args.stop else 'status'}
+        else:
+            request = {'properties': args.submit.split(',')}
+        response = await send_daemon_request(host, port, request)
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+        return
+    
+    if args.input:
+        os.environ['PROPERTY_SOURCE'] = args.input
+    if args.input_format:
+        os.environ['PROPERTY_SOURCE_FORMAT'] = args.input_format
+    if args.run_id:
+        os.environ['RUN_ID'] = args.run_id
+    
+    automation = MultiPropertyAutomation(args.shard_index, args.shard_count)
+    if args.serve:
+        daemon = DaemonServer(
+            automation, host, port,
+            int(os.getenv('DAEMON_RECYCLE_AFTER', '50')),
+            float(os.getenv('DAEMON_MAX_HEAP_MB', '512'))
+        )
+        await daemon.serve()
+    else:
+        await automation.run_automation()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    args = parse_args()
+    if args.merge_reports:
+        setup_logging()
+        write_merged_report(args.merge_reports, args.output)
+    else:
+        asyncio.run(main(args))